@@ -0,0 +1,84 @@
+"""
+    Batch pathfinding: shortest paths for many (start, end) pairs on one SearchGrid, without pygame.
+    Pairs are grouped by the cell their search tree is grown from, so every tree answers all
+    the pairs of its root, and the trees of different roots are grown in parallel processes.
+"""
+from constants import *
+from pathfinding import reconstruct_path, search_tree
+
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+
+# The grid of a worker process, sent once when the process starts instead of with every task
+worker_grid = None
+
+
+def set_worker_grid(grid):
+    global worker_grid
+    worker_grid = grid
+
+
+def batch_paths(grid, pairs, workers=None):
+    """
+        Returns the shortest path (list of flat indices, None if unreachable) of every (start, end)
+        pair of flat indices, in the order of pairs. One tree is grown per root (see group_pairs)
+        and stops once all of its targets are settled. Roots are spread over workers processes
+        (all cores by default), workers=1 or a single root runs in this process.
+    """
+    groups = group_pairs(grid, pairs)
+    tasks = list(groups.items())
+    workers = min(workers or os.cpu_count(), len(tasks))
+
+    if workers <= 1:
+        answers = [root_paths(grid, task) for task in tasks]
+    else:
+        chunk_size = max(1, len(tasks) // (workers * BATCH_CHUNKS_PER_WORKER))
+        with ProcessPoolExecutor(workers, initializer=set_worker_grid, initargs=(grid,)) as executor:
+            answers = list(executor.map(worker_root_paths, tasks, chunksize=chunk_size))
+
+    paths = [None] * len(pairs)
+    for (root, targets), found in zip(tasks, answers):
+        for (target, reverse, pair_indices), path in zip(targets, found):
+            if path is not None and reverse:
+                path = path[::-1]
+            for pair_index in pair_indices:
+                paths[pair_index] = path
+
+    return paths
+
+
+def group_pairs(grid, pairs):
+    """
+        Maps every tree root to a list of (target, reverse, pair indices). On grids without weights
+        a path read backwards is a shortest path too, so a pair is answered from the tree of
+        whichever of its cells takes part in more pairs (reverse is then True), which lets pairs
+        that share an end share one tree as well.
+    """
+    symmetric = grid.max_weight == DEFAULT_WEIGHT
+    usage = Counter(cell for pair in pairs for cell in pair)
+
+    groups = {}
+    for pair_index, (start, end) in enumerate(pairs):
+        reverse = symmetric and usage[end] > usage[start]
+        root, target = (end, start) if reverse else (start, end)
+        targets = groups.setdefault(root, {})
+        targets.setdefault((target, reverse), []).append(pair_index)
+
+    return {root: [(target, reverse, pair_indices) for (target, reverse), pair_indices in targets.items()]
+            for root, targets in groups.items()}
+
+
+# Task of a worker process, on the grid the process was started with
+def worker_root_paths(task):
+    return root_paths(worker_grid, task)
+
+
+# The paths from one root to each of its targets
+def root_paths(grid, task):
+    root, targets = task
+    dist, parents = search_tree(grid, [root], {target for target, _, _ in targets})
+
+    return [reconstruct_path(parents, root, target) if dist[target] != INF_DIST else None
+            for target, _, _ in targets]
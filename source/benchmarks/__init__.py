@@ -0,0 +1,13 @@
+# Headless benchmarks, run from the source directory: python -m benchmarks.<name>,
+# or python -m benchmarks for the whole suite with baseline comparison
+from graph import Graph
+
+import pygame
+
+
+# Graphs need a window only to size their (unused here) surface
+WINDOW_SIZE = (1000, 1000)
+
+
+def headless_graph(size):
+    return Graph(pygame.Surface(WINDOW_SIZE), size)
@@ -0,0 +1,74 @@
+"""
+    Compares answering many (start, end) pairs on one maze with a separate Dijkstra's search per pair
+    against batch_paths (one tree per root), in this process and on all cores, and checks that
+    every path costs the same. Pairs are drawn from a limited set of cells, the way agents of
+    a simulation share spawn points and destinations.
+
+    Usage (from the source directory): python -m benchmarks.batch_paths [size [pair count]]
+"""
+from constants import *
+from benchmarks.suite import generate
+from pathfinding import dijkstras
+from batch import batch_paths
+
+from copy import copy
+from random import Random
+from time import perf_counter
+import os
+import sys
+
+
+SIZE = 301
+PAIR_COUNT = 2000
+# Distinct cells the pairs are drawn from
+ENDPOINT_COUNT = 100
+SEED = 0
+
+
+def random_pairs(grid, pair_count):
+    rng = Random(SEED)
+    free = [index for index in range(grid.cell_count) if not grid.barriers[index]]
+    endpoints = rng.sample(free, min(ENDPOINT_COUNT, len(free)))
+
+    return [(rng.choice(endpoints), rng.choice(endpoints)) for _ in range(pair_count)]
+
+
+def separate_searches(grid, pairs):
+    paths = []
+    for start, end in pairs:
+        pair_grid = copy(grid)
+        pair_grid.start, pair_grid.end = start, end
+        paths.append(dijkstras(pair_grid).path)
+
+    return paths
+
+
+def path_cost(grid, path):
+    return None if path is None else sum(grid.weights[index] for index in path[1:])
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else SIZE
+    pair_count = int(sys.argv[2]) if len(sys.argv) > 2 else PAIR_COUNT
+    grid = generate(size, "Prim's", SEED).snapshot()
+    pairs = random_pairs(grid, pair_count)
+    print(f"{pair_count} pairs between {ENDPOINT_COUNT} cells of a {size}x{size} maze")
+
+    runs = [("separate searches", lambda: separate_searches(grid, pairs)),
+            ("batch, 1 process", lambda: batch_paths(grid, pairs, workers=1)),
+            (f"batch, {os.cpu_count()} process(es)", lambda: batch_paths(grid, pairs))]
+
+    expected = None
+    print(f"{'method':<24}{'time [s]':>10}{'same costs':>12}")
+    for label, run in runs:
+        start_time = perf_counter()
+        paths = run()
+        elapsed = perf_counter() - start_time
+
+        costs = [path_cost(grid, path) for path in paths]
+        expected = expected or costs
+        print(f"{label:<24}{elapsed:>10.3f}{'yes' if costs == expected else 'NO':>12}")
+
+
+if __name__ == "__main__":
+    main()
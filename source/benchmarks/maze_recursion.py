@@ -0,0 +1,137 @@
+"""
+    Compares the old recursive backtrack/divide generators against the explicit-stack ones,
+    checking that both produce the same maze (and the same sequence of changed nodes) for a seed.
+    The recursive backtracker runs out of stack on bigger grids, which is reported as such.
+
+    Usage (from the source directory): python -m benchmarks.maze_recursion [size ...]
+"""
+from constants import *
+from benchmarks import headless_graph
+from maze_generation import backtrack, divide, choose_orientation
+
+from random import seed, shuffle, randrange
+from math import floor
+from time import perf_counter
+import sys
+
+
+SIZES = [LARGE, 150, 300, 600]
+SEED = 0
+
+
+# Old backtrack: one level of recursion per carved cell
+def backtrack_recursive(graph, row, col):
+    current = graph.get_node(row, col)
+    if current.is_barrier():
+        current.set_free()
+        yield current
+
+    valid_directions = DIRECTIONS.copy()
+    shuffle(valid_directions)
+
+    while valid_directions:
+        direction = valid_directions.pop()
+        new_row, new_col = row + direction[0] * 2, col + direction[1] * 2
+        if graph.is_valid_node(new_row, new_col, offset=1):
+            far_neighbor = graph.get_node(new_row, new_col)
+
+            if not far_neighbor.is_free():
+                new_row, new_col = row + direction[0], col + direction[1]
+                if graph.is_valid_node(new_row, new_col, offset=1):
+                    link = graph.get_node(new_row, new_col)
+                    if link.is_barrier():
+                        link.set_free()
+                        yield link
+
+                yield from backtrack_recursive(graph, far_neighbor.row, far_neighbor.col)
+
+
+# Old divide: one level of recursion per wall
+def divide_recursive(graph, min_row, max_row, min_col, max_col):
+    width, height = max_row - min_row, max_col - min_col
+    horizontal = choose_orientation(width, height)
+
+    if horizontal:
+        if width < 2:
+            return
+
+        col = floor(randrange(min_col, max_col+1) / 2) * 2
+        hole = floor(randrange(min_row, max_row+1) / 2) * 2 + 1
+
+        for row in range(min_row, max_row+1):
+            current = graph.get_node(col, row)
+            if row == hole and not current.is_start() and not current.is_end():
+                current.set_free()
+            else:
+                current.set_barrier()
+
+            yield current
+
+        yield from divide_recursive(graph, min_row, max_row, min_col, col-1)
+        yield from divide_recursive(graph, min_row, max_row, col+1, max_col)
+    else:
+        if height < 2:
+            return
+
+        row = floor(randrange(min_row, max_row+1) / 2) * 2
+        hole = floor(randrange(min_col, max_col+1) / 2) * 2 + 1
+
+        for col in range(min_col, max_col+1):
+            current = graph.get_node(col, row)
+            if col == hole and not current.is_start() and not current.is_end():
+                current.set_free()
+            else:
+                current.set_barrier()
+
+            yield current
+
+        yield from divide_recursive(graph, min_row, row-1, min_col, max_col)
+        yield from divide_recursive(graph, row+1, max_row, min_col, max_col)
+
+
+def run_backtrack(generator, graph):
+    graph.fill()
+    return generator(graph, 1, 1)
+
+
+def run_divide(generator, graph):
+    return generator(graph, 0, graph.cols-1, 0, graph.rows-1)
+
+
+def measure(generator, run, size):
+    """
+        Returns the elapsed time, the positions of the changed nodes and the final state array,
+        or None if the generator ran out of stack.
+    """
+    graph = headless_graph(size)
+    seed(SEED)
+    start_time = perf_counter()
+    try:
+        changes = [(node.row, node.col) for node in run(generator, graph)]
+    except RecursionError:
+        return None
+    elapsed = perf_counter() - start_time
+
+    return elapsed, changes, graph.state
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or SIZES
+    generators = [("Backtrack", run_backtrack, backtrack_recursive, backtrack),
+                  ("Division", run_divide, divide_recursive, divide)]
+
+    print(f"{'algorithm':<12}{'size':>6}{'recursive [s]':>16}{'iterative [s]':>16}{'same maze':>12}")
+    for label, run, recursive, iterative in generators:
+        for size in sizes:
+            old = measure(recursive, run, size)
+            new = measure(iterative, run, size)
+            if old is None:
+                old_time, same = "stack overflow", "-"
+            else:
+                old_time = f"{old[0]:.3f}"
+                same = "yes" if old[1] == new[1] and (old[2] == new[2]).all() else "NO"
+            print(f"{label:<12}{size:>6}{old_time:>16}{new[0]:>16.3f}{same:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+    Compares peak memory and time of path copying (the old bfs/dijkstras) against
+    parent pointers on open grids, where every discovered node used to carry its own path.
+
+    Usage (from the source directory): python -m benchmarks.path_reconstruction [size ...]
+"""
+from constants import *
+from pathfinding import SearchGrid, bfs, dijkstras
+
+from collections import deque
+from heapq import heappush, heappop
+from time import perf_counter
+import tracemalloc
+import sys
+
+
+# Path copying holds about 8x more memory per doubling of the size (over 200 MiB at 300)
+SIZES = [LARGE, 150, 300]
+
+
+# Old bfs: every queued node carries a copy of its whole path
+def bfs_path_copying(grid):
+    start, end = grid.start, grid.end
+    queue = deque([(start, [start])])
+    seen = {start}
+
+    while queue:
+        current, path = queue.popleft()
+        for neighbor in grid.get_neighbors(current):
+            if neighbor not in seen:
+                if neighbor == end:
+                    return path + [neighbor]
+                seen.add(neighbor)
+                queue.append((neighbor, path + [neighbor]))
+
+
+# Old dijkstras: every relaxation stores a fresh copy of the parent's path
+def dijkstras_path_copying(grid):
+    start, end = grid.start, grid.end
+    source_dist = {start: 0}
+    paths = {start: []}
+    to_visit = [(0, start)]
+    done = set()
+
+    while to_visit:
+        dist, current = heappop(to_visit)
+        if current in done:
+            continue
+        done.add(current)
+
+        if current == end:
+            return paths[current] + [current]
+
+        for neighbor in grid.get_neighbors(current):
+            if dist + 1 < source_dist.get(neighbor, INF_DIST):
+                source_dist[neighbor] = dist + 1
+                paths[neighbor] = paths[current] + [current]
+                heappush(to_visit, (dist + 1, neighbor))
+
+
+def measure(algorithm, grid):
+    tracemalloc.start()
+    start_time = perf_counter()
+    algorithm(grid)
+    elapsed = perf_counter() - start_time
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or SIZES
+    algorithms = [("BFS (path copying)", bfs_path_copying),
+                  ("BFS (parent pointers)", bfs),
+                  ("Dijkstra's (path copying)", dijkstras_path_copying),
+                  ("Dijkstra's (parent pointers)", dijkstras)]
+
+    print(f"{'algorithm':<30}{'size':>6}{'time [s]':>12}{'peak [MiB]':>14}")
+    for label, algorithm in algorithms:
+        for size in sizes:
+            # Open grid, corner to corner: the worst case for path copying
+            grid = SearchGrid(size, [False] * (size * size), 0, size * size - 1)
+            elapsed, peak = measure(algorithm, grid)
+            print(f"{label:<30}{size:>6}{elapsed:>12.3f}{peak / 2 ** 20:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+    Runs every maze generator and every pathfinding algorithm headless over several sizes and seeds,
+    recording wall time, peak memory, expanded nodes and path length of each run.
+    Results are written to JSON and CSV and compared against a stored baseline: changed expanded
+    counts or path lengths are always reported, time and memory only above the tolerance.
+
+    Usage (from the source directory):
+        python -m benchmarks                        run, write results and compare with the baseline
+        python -m benchmarks --save-baseline        run and store the results as the new baseline
+        python -m benchmarks --sizes 51 --seeds 0   any subset of sizes, seeds, mazes or algorithms
+"""
+from constants import *
+from benchmarks import headless_graph
+from pathfinding import PATHFINDING_ALGORITHMS
+
+from argparse import ArgumentParser
+from collections import deque
+from datetime import datetime
+from random import Random
+from time import perf_counter
+import tracemalloc
+import platform
+import json
+import csv
+import sys
+
+
+SIZES = [LARGE, 151, 301]
+SEEDS = [0, 1, 2]
+FIELDS = ["kind", "algorithm", "maze", "size", "seed", "time_s", "peak_kib",
+          "expanded", "pushed", "max_frontier", "path_length"]
+# Fields that are deterministic for a seed, any change is a behavior change, not noise
+EXACT_FIELDS = ["expanded", "pushed", "max_frontier", "path_length"]
+MEASURED_FIELDS = ["time_s", "peak_kib"]
+# Times this short are dominated by noise and never reported as regressions
+MIN_COMPARED_TIME = 0.005
+
+
+def measure(run, repeat):
+    """
+        Returns the result of run, its best wall time out of repeat runs and its peak memory in KiB,
+        the latter from a separate run so that tracemalloc does not slow down the timed ones.
+    """
+    best_time = float("inf")
+    for _ in range(repeat):
+        start_time = perf_counter()
+        result = run()
+        best_time = min(best_time, perf_counter() - start_time)
+
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return result, best_time, peak / 1024
+
+
+def generate(size, maze, seed):
+    """
+        Returns a graph with the given maze between the corner nodes, as generated by the app.
+    """
+    graph = headless_graph(size)
+    graph.set_start(graph.get_node(1, 1))
+    graph.set_end(graph.get_node(graph.rows-2, graph.cols-2))
+
+    graph.clear(save_barriers=False)
+    deque(graph.maze_steps(maze, Random(seed)), maxlen=0)
+
+    return graph
+
+
+def run_suite(sizes, seeds, mazes, algorithms, repeat):
+    records = []
+    for size in sizes:
+        for maze in mazes:
+            for seed in seeds:
+                record = {"maze": maze, "size": size, "seed": seed}
+                graph, time_s, peak_kib = measure(lambda: generate(size, maze, seed), repeat)
+                records.append({"kind": "maze", "algorithm": maze, **record,
+                                "time_s": time_s, "peak_kib": peak_kib,
+                                "expanded": None, "pushed": None, "max_frontier": None, "path_length": None})
+                print_record(records[-1])
+
+                grid = graph.snapshot()
+                for label in algorithms:
+                    algorithm = PATHFINDING_ALGORITHMS[label]
+                    result, time_s, peak_kib = measure(lambda: algorithm(grid), repeat)
+                    path_length = len(result.path) if result.path else None
+                    records.append({"kind": "search", "algorithm": label, **record,
+                                    "time_s": time_s, "peak_kib": peak_kib,
+                                    "expanded": result.expanded, "pushed": result.pushed,
+                                    "max_frontier": result.max_frontier, "path_length": path_length})
+                    print_record(records[-1])
+
+    return records
+
+
+def print_record(record):
+    expanded = "-" if record["expanded"] is None else record["expanded"]
+    path_length = "-" if record["path_length"] is None else record["path_length"]
+    print(f"{record['kind']:<8}{record['algorithm']:<12}{record['maze']:<11}{record['size']:>6}"
+          f"{record['seed']:>6}{record['time_s']:>11.4f}{record['peak_kib']:>12.1f}"
+          f"{expanded:>10}{path_length:>8}")
+
+
+def write_json(path, records):
+    metadata = {"date": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform()}
+    with open(path, "w") as file:
+        json.dump({"metadata": metadata, "records": records}, file, indent=1)
+
+
+def write_csv(path, records):
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def record_key(record):
+    return tuple(record[field] for field in ("kind", "algorithm", "maze", "size", "seed"))
+
+
+def compare(records, baseline, tolerance):
+    """
+        Returns a description of every regression of records against the baseline records.
+    """
+    baseline = {record_key(record): record for record in baseline}
+    regressions = []
+    for record in records:
+        old = baseline.get(record_key(record))
+        if old is None:
+            continue
+
+        name = f"{record['maze']} {record['size']} seed {record['seed']}"
+        if record["kind"] == "search":
+            name = f"{record['algorithm']} on {name}"
+        for field in EXACT_FIELDS:
+            # Baselines saved before a field was recorded have nothing to compare it with
+            if field in old and record[field] != old[field]:
+                regressions.append(f"{name}: {field} changed from {old[field]} to {record[field]}")
+
+        for field in MEASURED_FIELDS:
+            if field == "time_s" and record[field] < MIN_COMPARED_TIME:
+                continue
+            if record[field] > old[field] * (1 + tolerance):
+                regressions.append(f"{name}: {field} grew from {old[field]:.4f} to {record[field]:.4f}")
+
+    return regressions
+
+
+def parse_arguments():
+    parser = ArgumentParser(prog="python -m benchmarks",
+                            description="Benchmarks the maze generators and pathfinding algorithms.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--seeds", type=int, nargs="+", default=SEEDS)
+    parser.add_argument("--mazes", nargs="+", default=MAZE_LABELS, choices=MAZE_LABELS)
+    parser.add_argument("--algorithms", nargs="+", default=list(PATHFINDING_ALGORITHMS),
+                        choices=list(PATHFINDING_ALGORITHMS))
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs of each benchmark, the best is kept")
+    parser.add_argument("--json", default="benchmark_results.json")
+    parser.add_argument("--csv", default="benchmark_results.csv")
+    parser.add_argument("--baseline", default="benchmark_baseline.json")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store the results as the baseline instead of comparing with it")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative growth of time and memory (default 0.25)")
+
+    return parser.parse_args()
+
+
+def main():
+    arguments = parse_arguments()
+
+    print(f"{'kind':<8}{'algorithm':<12}{'maze':<11}{'size':>6}{'seed':>6}"
+          f"{'time [s]':>11}{'peak [KiB]':>12}{'expanded':>10}{'path':>8}")
+    records = run_suite(arguments.sizes, arguments.seeds, arguments.mazes,
+                        arguments.algorithms, max(1, arguments.repeat))
+    write_json(arguments.json, records)
+    write_csv(arguments.csv, records)
+    print(f"Results written to {arguments.json} and {arguments.csv}")
+
+    if arguments.save_baseline:
+        write_json(arguments.baseline, records)
+        print(f"Baseline saved to {arguments.baseline}")
+        return
+
+    try:
+        with open(arguments.baseline, "r") as file:
+            baseline = json.load(file)["records"]
+    except FileNotFoundError:
+        print(f"No baseline at {arguments.baseline}, run with --save-baseline to create one")
+        return
+
+    regressions = compare(records, baseline, arguments.tolerance)
+    for regression in regressions:
+        print(regression)
+    if regressions:
+        print(f"{len(regressions)} regression(s) against {arguments.baseline}")
+        sys.exit(1)
+    print(f"No regressions against {arguments.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,11 +6,13 @@ from math import inf
 
 
 class BigButton:
-    def __init__(self, screen, label, x, y, color=FREE_COLOR,  visible=True, cooldown=0):
+    def __init__(self, screen, label, x, y, color=FREE_COLOR,  visible=True, cooldown=0, height=None):
         self.label = label
         self.x = x
         self.y = y
         self.width, self.height = get_big_button_size(screen.window)
+        if height is not None:
+            self.height = height
         self.rect = pygame.Rect(x, y, self.width, self.height)
         self.color = color
         self.visible = visible
@@ -20,9 +22,7 @@ class BigButton:
     def draw(self, window):
         if self.visible:
             pygame.draw.rect(window, self.color, self.rect)
-            current_font = pygame.font.SysFont(
-                FONT, get_big_button_font_size(window))
-            label = current_font.render(self.label, True, BUTTON_FONT_COLOR)
+            label = render_text(self.label, get_big_button_font_size(self.height), BUTTON_FONT_COLOR)
             label_rect = label.get_rect(
                 center=(self.x + self.width // 2, self.y + self.height // 2))
             window.blit(label, label_rect)
@@ -56,9 +56,7 @@ class SmallButton:
 
     def draw(self, window):
         pygame.draw.rect(window, self.color, self.rect)
-        current_font = pygame.font.SysFont(
-            FONT, get_small_button_font_size(window))
-        label = current_font.render(self.label, True, BUTTON_FONT_COLOR)
+        label = render_text(self.label, get_small_button_font_size(window), BUTTON_FONT_COLOR)
         label_rect = label.get_rect(
             center=(self.x + self.size // 2, self.y + self.size // 2))
         window.blit(label, label_rect)
@@ -84,7 +82,7 @@ def initialize_buttons(screen, algorithm_running=False):
 
     # Initialize buttons for changing graph size
     x = side_size * (1.41) + grid_size - small_button_size * 0.95
-    y = tb_size + 10.1 * small_button_size + legend_font_size
+    y = tb_size + 11.1 * small_button_size + legend_font_size
     diff = small_button_size * 1.2
 
     size_buttons = {SMALL: SmallButton(screen, "S", x, y),
@@ -106,9 +104,9 @@ def initialize_buttons(screen, algorithm_running=False):
 
     # Initialize action buttons
     x -= small_button_size * 0.95
-    y += diff * 1.7
-    diff_grid = small_button_size * 4.3 + legend_font_size + diff*1.7
-    diff = big_button_height + small_button_size*0.5
+    y += diff * 1.3
+    diff_grid = small_button_size * 4.3 + legend_font_size + diff*1.3
+    diff = big_button_height + small_button_size*0.25
 
     action_buttons = {"RUN": BigButton(screen, "RUN", x, y, color=START_COLOR, visible=(not algorithm_running), cooldown=DEFAULT_BUTTON_COOLDOWN),
                       "FINISH": BigButton(screen, "FINISH", x, y, color=VISITED_COLOR, visible=algorithm_running, cooldown=DEFAULT_BUTTON_COOLDOWN),
@@ -124,23 +122,37 @@ def initialize_buttons(screen, algorithm_running=False):
     screen.add_buttons("gridline_buttons", gridline_buttons)
     update_gridline_buttons(screen)
 
-    # Initialize buttons for maze-generating algorithms
-    x -= side_size + grid_size
-    y += diff * 2
-    diff = big_button_height + small_button_size
-
-    maze_buttons = {"Prim's": BigButton(screen, "Prim's", x, y - diff*3, color=MAZE_BUTTON_COLOR),
-                    "Division": BigButton(screen, "Division", x, y - diff*2,  color=MAZE_BUTTON_COLOR),
-                    "Backtrack": BigButton(screen, "Backtrack", x, y - diff, color=MAZE_BUTTON_COLOR),
-                    "Random": BigButton(screen, "Random", x, y,  color=MAZE_BUTTON_COLOR)}
+    # Buttons on the left tab are spread evenly over the height of the grid,
+    # shrinking when there are too many of them to fit at full size
+    pathfinding_labels = ["BFS", "DFS", "Dijkstra's", "A*", "JPS", "JPS-8", "Bi-BFS", "Bi-A*"]
+    maze_labels = MAZE_LABELS
+    slot_count = len(pathfinding_labels) + len(maze_labels) + 1
 
-    screen.add_buttons("maze_buttons", maze_buttons)
+    x -= side_size + grid_size
+    diff = min(big_button_height + small_button_size, grid_size / slot_count)
+    height = diff * 7/11
+    y = tb_size + (grid_size - diff * slot_count + diff - height) / 2
 
     # Initialize buttons for pathfinding algorithms
-    pathfinding_buttons = {"BFS": BigButton(screen, "BFS", x, y - diff*7),
-                           "DFS": BigButton(screen, "DFS", x, y - diff*6),
-                           "Dijkstra's": BigButton(screen, "Dijkstra's", x, y - diff*5),
-                           "A*": BigButton(screen, "A*", x, y - diff*4)}
+    pathfinding_buttons = {}
+    for label in pathfinding_labels:
+        pathfinding_buttons[label] = BigButton(screen, label, x, y, height=height)
+        y += diff
 
     screen.add_buttons("pathfinding_buttons", pathfinding_buttons)
     update_pathfinding_buttons(screen)
+
+    # Initialize buttons for maze-generating algorithms
+    maze_buttons = {}
+    for label in maze_labels:
+        maze_buttons[label] = BigButton(screen, label, x, y, color=MAZE_BUTTON_COLOR, height=height)
+        y += diff
+
+    screen.add_buttons("maze_buttons", maze_buttons)
+
+    # Initialize buttons for switching between painting barriers and weights
+    brush_buttons = {"WALLS": BigButton(screen, "WALLS", x, y, color=FREE_COLOR, cooldown=DEFAULT_BUTTON_COOLDOWN, height=height),
+                     "WEIGHTS": BigButton(screen, "WEIGHTS", x, y, color=WEIGHT_COLOR, cooldown=DEFAULT_BUTTON_COOLDOWN, height=height)}
+
+    screen.add_buttons("brush_buttons", brush_buttons)
+    update_brush_buttons(screen)
@@ -1,15 +1,46 @@
 SMALL, MEDIUM, LARGE = 25, 45, 75
 SLOW, NORMAL, FAST = "S", "N", "F"
 
-DELAYS = {
-    SLOW: {SMALL: 30, MEDIUM: 20, LARGE: 10},
-    NORMAL: {SMALL: 20, MEDIUM: 10, LARGE: 5},
-    FAST: {SMALL: 10, MEDIUM: 5, LARGE: 3}
-}
+# Any size up to MAX_GRID_SIZE cells per side works, the presets above are the S/M/L buttons
+MAX_GRID_SIZE = 4096
+# Below this many pixels per node, nodes stop being whole pixels (see get_grid_size)
+MIN_WHOLE_NODE_SIZE = 4
+
+# Step delay in ms is DELAY_SCALE / side ** DELAY_EXPONENT (side of a square with as many cells),
+# fitted to the delays once tuned by hand for the presets, times the factor of the animation speed
+DELAY_SCALE = 1157
+DELAY_EXPONENT = 1.26
+SPEED_FACTORS = {SLOW: 1.75, NORMAL: 1, FAST: 0.5}
+# Animating every cell of a huge grid takes at most this long (ms, at NORMAL speed)
+MAX_ANIMATION_DURATION = 30000
+
+# Viewport
+ZOOM_STEP = 1.25
+MIN_VISIBLE_CELLS = 8
+MIN_GRIDLINE_CELL_SIZE = 3
 
 MAZE_DELAY_MULTIPLIER = 2
+MAZE_LABELS = ["Prim's", "Kruskal's", "Eller's", "Wilson's", "Division", "Backtrack", "Random"]
+
+# Share of nodes the Random maze turns into barriers
+RANDOM_MAZE_DENSITY = 1/3
+# Maze seeds are drawn from 0 to MAX_SEED (short enough to read off the status line)
+MAX_SEED = 999999
+# Bigger mazes are generated at once instead of animated node by node
+MAX_ANIMATED_MAZE_CELLS = 1000 * 1000
+MAX_PATH_DELAY = 80
+
+FPS = 60
+FRAME_DURATION = 1000 / FPS
+MAX_DIRTY_RECTS = 1000
+
+# Cached surfaces the window is composed of (see Screen.draw)
+LAYERS = ("grid", "legend", "buttons")
 
 FONT = None
+# Rendered labels kept by render_text: the buttons and legend need a few dozen, the rest
+# (status lines, stats, race labels) are rerendered when evicted
+TEXT_CACHE_SIZE = 256
 
 DEFAULT_BUTTON_COOLDOWN = 200
 
@@ -20,6 +51,18 @@ DIRECTIONS = [
     (-1, 0)
 ]
 
+# Adjacency bitmasks use bit i for DIRECTIONS[i]
+ALL_DIRECTIONS_MASK = 0b1111
+# Flow field direction of cells without a next step
+NO_DIRECTION = -1
+
+DIAGONAL_DIRECTIONS = [
+    (1, 1),
+    (1, -1),
+    (-1, 1),
+    (-1, -1)
+]
+
 BLACK = (0, 0, 0)
 BLUE = (0, 0, 255)
 GRAY = (128, 128, 128)
@@ -29,15 +72,70 @@ WHITE = (255, 255, 255)
 YELLOW = (255, 255, 0)
 LIGHT_GREEN = (127, 255, 148)
 MAGENTA = (186, 85, 211)
+ORANGE = (255, 140, 0)
+CYAN = (0, 200, 255)
+
 
+# Cell states stored in Graph.state (uint8)
+FREE_STATE = 0
+BARRIER_STATE = 1
+START_STATE = 2
+END_STATE = 3
+VISITED_STATE = 4
+PATH_STATE = 5
+PATH_HEAD_STATE = 6
+VISITED_BACKWARD_STATE = 7
+
+# Marks unreached cells in Graph.dist and cells without a parent in Graph.parent
+INF_DIST = 2 ** 31 - 1
+NO_PARENT = -1
+
+# Traversal cost of a free cell and of a cell painted with the weight brush (stored in Graph.weight)
+DEFAULT_WEIGHT = 1
+WEIGHTED_NODE_COST = 5
+
+# Heaviest weight for which Dijkstra's uses the bucket queue instead of the heap
+MAX_BUCKET_WEIGHT = 255
+
+# Columns of SearchStats.as_dict, in the order the stats panel and the export list them
+SEARCH_STATS_FIELDS = ("algorithm", "rows", "cols", "expanded", "pushed", "max_frontier", "visited",
+                       "found", "path_length", "path_cost", "compute_time", "animation_time", "cached")
+SEARCH_STATS_FILE = "search_stats.csv"
+
+# Flow field heatmap: distances to the end shade from the first color (near) to the last (far),
+# arrows pointing along the flow are drawn once cells are at least FLOW_ARROW_MIN_CELL_SIZE pixels
+HEATMAP_COLORS = ((255, 240, 120), (235, 90, 40), (70, 20, 120))
+HEATMAP_UNREACHABLE_COLOR = (90, 90, 90)
+FLOW_ARROW_COLOR = BLACK
+FLOW_ARROW_MIN_CELL_SIZE = 12
+
+# Memory budget of the search results kept for repeated runs on an unchanged grid
+RESULT_CACHE_BYTES = 256 * 2**20
+
+# Batch pathfinding hands every worker process about this many chunks of tree roots
+BATCH_CHUNKS_PER_WORKER = 4
+
+# Pixels between the split viewports of a race and opacity of the backdrop behind their labels
+RACE_PANEL_GAP = 4
+RACE_LABEL_ALPHA = 160
+# Race labels use the legend font, scaled down to fit several panels
+RACE_FONT_SCALE = 0.8
 
 BARRIER_COLOR = BLACK
 FREE_COLOR = WHITE
 START_COLOR = GREEN
 END_COLOR = RED
 PATH_COLOR = MAGENTA
+PATH_HEAD_COLOR = YELLOW
 VISITED_COLOR = BLUE
+VISITED_BACKWARD_COLOR = CYAN
+WEIGHT_COLOR = ORANGE
 LINE_COLOR = GRAY
+GRIDLINE_COLORKEY = (255, 0, 255)
 MAZE_BUTTON_COLOR = LIGHT_GREEN
 BUTTON_FONT_COLOR = BLACK
 LEGEND_FONT_COLOR = WHITE
+
+# Color of every cell state, indexed by the state value
+STATE_COLORS = (FREE_COLOR, BARRIER_COLOR, START_COLOR, END_COLOR,
+                VISITED_COLOR, PATH_COLOR, PATH_HEAD_COLOR, VISITED_BACKWARD_COLOR)
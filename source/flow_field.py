@@ -0,0 +1,68 @@
+"""
+    Distance and flow fields: one sweep of Dijkstra's algorithm from a set of target cells over
+    the whole grid gives every cell its cost to the nearest target and the direction of its next
+    step towards it, so any number of agents can walk to the targets with one lookup per step.
+"""
+from constants import *
+from pathfinding import search_tree
+
+import numpy as np
+
+
+class FlowField:
+    """
+        Fields of a SearchGrid towards targets (flat indices), as (rows, cols) arrays:
+        dist is the cost of the cheapest path from a cell to the nearest target (INF_DIST if none
+        is reachable) and direction the index into DIRECTIONS of its first step (NO_DIRECTION on
+        targets, barriers and unreachable cells). Steps pay the weight of the cell they enter.
+    """
+
+    def __init__(self, grid, targets):
+        self.rows, self.cols = grid.rows, grid.cols
+        self.targets = list(targets)
+
+        dist, parents = search_tree(grid, self.targets, reverse=True)
+        self.dist = np.array(dist, dtype=np.int32).reshape(self.rows, self.cols)
+        self.direction = get_directions(np.array(parents, dtype=np.int64).reshape(self.rows, self.cols))
+
+        reachable = self.dist[self.dist != INF_DIST]
+        self.reachable = reachable.size
+        self.max_dist = int(reachable.max()) if reachable.size else 0
+
+    def next_cell(self, row, col):
+        direction = self.direction[row, col]
+        if direction == NO_DIRECTION:
+            return None
+
+        dr, dc = DIRECTIONS[direction]
+        return row + dr, col + dc
+
+    def path_from(self, row, col):
+        """
+            Returns the cells an agent at (row, col) walks through to the nearest target,
+            or None if no target is reachable from it.
+        """
+        if self.dist[row, col] == INF_DIST:
+            return None
+
+        path = [(row, col)]
+        position = self.next_cell(row, col)
+        while position is not None:
+            path.append(position)
+            position = self.next_cell(*position)
+
+        return path
+
+
+# Index into DIRECTIONS of the step from every cell to its parent, for a whole parent array at once
+def get_directions(parents):
+    rows, cols = parents.shape
+    parent_rows, parent_cols = np.divmod(parents, cols)
+    dr = parent_rows - np.arange(rows)[:, None]
+    dc = parent_cols - np.arange(cols)[None, :]
+
+    direction = np.full(parents.shape, NO_DIRECTION, dtype=np.int8)
+    for index, (row_step, col_step) in enumerate(DIRECTIONS):
+        direction[(parents != NO_PARENT) & (dr == row_step) & (dc == col_step)] = index
+
+    return direction
@@ -2,123 +2,564 @@ from constants import *
 from helpers import *
 from pathfinding import *
 from maze_generation import *
+from flow_field import FlowField
+from result_cache import result_size
 
 import pygame
-from math import inf
+import numpy as np
+from itertools import chain
+from collections import deque
+from copy import copy
+from math import ceil, floor
+from random import Random
+from time import perf_counter
+
+
+# When cells are smaller than a pixel, each block of cells drawn as one pixel shows the state
+# with the highest priority, so e.g. a path through visited nodes stays visible on big grids
+WEIGHTED_CODE = len(STATE_COLORS)
+DRAW_PRIORITY = (FREE_STATE, WEIGHTED_CODE, BARRIER_STATE, VISITED_STATE, VISITED_BACKWARD_STATE,
+                 PATH_STATE, PATH_HEAD_STATE, START_STATE, END_STATE)
+CODE_PRIORITY = np.argsort(DRAW_PRIORITY).astype(np.uint8)
+PRIORITY_COLORS = np.array([(STATE_COLORS + (WEIGHT_COLOR,))[code] for code in DRAW_PRIORITY], dtype=np.uint8)
+HEATMAP_STOPS = np.linspace(0, 1, len(HEATMAP_COLORS))
+
+
+# Reduces every block x block group of cells of a 2D array to one value, the edges padded with fill
+def reduce_blocks(array, block, fill, reduce):
+    height, width = ceil(array.shape[0] / block), ceil(array.shape[1] / block)
+    padded = np.full((height * block, width * block), fill, dtype=array.dtype)
+    padded[:array.shape[0], :array.shape[1]] = array
+
+    return reduce(padded.reshape(height, block, width, block), axis=(1, 3))
+
+
+# Cells and states of the visits of a search from first up to last, for marking them in bulk
+def visited_cells(result, first=0, last=None):
+    cells = np.array(result.visited[first:last], dtype=np.int64)
+    states = np.full(len(cells), VISITED_STATE, dtype=np.uint8)
+    if result.backward is not None:
+        states[np.array(result.backward[first:last], dtype=bool)] = VISITED_BACKWARD_STATE
+
+    return cells, states
+
+
+# Bulk set_visited() and set_path() on a state array: start and end cells keep their colors
+def mark_cells(state, cells, states):
+    flat = state.reshape(-1)
+    keep = (flat[cells] != START_STATE) & (flat[cells] != END_STATE)
+    flat[cells[keep]] = states[keep]
+
+
+# The content hash of a graph is the XOR of the hashes of its cells, so changing one cell updates it
+# in O(1). A cell's code is 0 for barriers and its weight otherwise, cells with the default code add 0.
+def cell_hash(index, code):
+    if code == DEFAULT_WEIGHT:
+        return 0
+
+    # SplitMix64 finalizer of the (index, code) pair
+    z = (index * 256 + code + 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    return z ^ (z >> 31)
+
+
+# cell_hash of arrays of indices and (non-default) codes at once, for bulk changes
+def cell_hashes(indices, codes):
+    z = indices.astype(np.uint64) * np.uint64(256) + codes.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
 
 
 class Graph:
     def __init__(self, window, size, gridlines=False):
         self.gridlines = gridlines
         self.size = size
-        self.node_size = round(get_grid_size(window, self) / size)
-        self.grid = [[GraphNode(row, col) for col in range(size)]
-                     for row in range(size)]
+        self.rows, self.cols = grid_shape(size)
+
+        # Viewport: zoom 1 fits the whole graph, view_row and view_col are the (fractional)
+        # coordinates of the cell in the top left corner
+        self.zoom = 1
+        self.view_row, self.view_col = 0, 0
+        self.resize_nodes(window)
+
+        shape = (self.rows, self.cols)
+        self.state = np.full(shape, FREE_STATE, dtype=np.uint8)
+        self.dist = np.full(shape, INF_DIST, dtype=np.int32)
+        self.parent = np.full(shape, NO_PARENT, dtype=np.int32)
+        self.weight = np.full(shape, DEFAULT_WEIGHT, dtype=np.uint8)
+        self.adjacency = np.zeros(shape, dtype=np.uint8)
+        self.rebuild_adjacency()
+        self.content_hash = 0
         self.start = None
         self.end = None
+        self.flow_field = None
 
     def draw(self, screen, update=False):
-        for row in self.grid:
-            for node in row:
-                node.draw(screen)
+        """
+            Re-renders the grid layer from the state arrays and blits it to the window. The colors
+            of the visible cells are scaled to the viewport in one go, gridlines are a cached overlay.
+        """
+        surface = self.surface
+        cell_size = self.get_cell_size()
+        min_row, max_row, min_col, max_col = self.get_visible_cells()
+        block = max(1, ceil(1 / cell_size))
+
+        colors = self.get_cell_colors(slice(min_row, max_row), slice(min_col, max_col), block)
+        cells = pygame.surfarray.make_surface(colors.transpose(1, 0, 2))
+        width = round(colors.shape[1] * block * cell_size)
+        height = round(colors.shape[0] * block * cell_size)
+
+        surface.fill(screen.background)
+        surface.blit(pygame.transform.scale(cells, (width, height)), self.get_node_pos(min_row, min_col))
+        if self.flow_field is not None and cell_size >= FLOW_ARROW_MIN_CELL_SIZE:
+            self.draw_flow_arrows(min_row, max_row, min_col, max_col)
+
+        if self.shows_gridlines():
+            view = (self.zoom, self.view_row, self.view_col)
+            if self.gridline_overlay is None or self.gridline_view != view:
+                self.gridline_overlay = self.create_gridline_overlay()
+                self.gridline_view = view
+            surface.blit(self.gridline_overlay, (0, 0))
+
+        self.blit(screen)
         if screen.animate or update:
-            pygame.display.update()
+            screen.renderer.flush()
+
+    def get_cell_colors(self, rows=slice(None), cols=slice(None), block=1, state=None):
+        """
+            Returns an array with the RGB color of every cell in the given slices, or of every
+            block x block group of them (see DRAW_PRIORITY). A state array other than the graph's
+            own (e.g. a race panel's copy) can be passed in.
+        """
+        own_state = state is None
+        state = (self.state if own_state else state)[rows, cols]
+        priority = CODE_PRIORITY[state]
+        priority[(state == FREE_STATE) & (self.weight[rows, cols] != DEFAULT_WEIGHT)] = CODE_PRIORITY[WEIGHTED_CODE]
+        if block > 1:
+            priority = reduce_blocks(priority, block, 0, np.max)
+        colors = PRIORITY_COLORS[priority]
+
+        # The flow field heatmap shades free and weighted cells, and blocks of barriers that some flow
+        # passes through (a maze drawn in blocks has barriers in all of them), the rest keep their colors
+        if self.flow_field is not None and own_state:
+            heat, reachable = self.get_heat_colors(rows, cols, block)
+            shaded = (priority <= CODE_PRIORITY[WEIGHTED_CODE]) | \
+                ((priority == CODE_PRIORITY[BARRIER_STATE]) & reachable)
+            colors[shaded] = heat[shaded]
+
+        return colors
+
+    def get_heat_colors(self, rows, cols, block):
+        """
+            Returns the heatmap color of the distance to the end of every cell in the given slices,
+            or of the nearest cell of every block x block group of them, and which ones reach the end.
+        """
+        dist = self.flow_field.dist[rows, cols]
+        if block > 1:
+            dist = reduce_blocks(dist, block, INF_DIST, np.min)
+
+        heat = dist / max(1, self.flow_field.max_dist)
+        colors = np.stack([np.interp(heat, HEATMAP_STOPS, [color[channel] for color in HEATMAP_COLORS])
+                           for channel in range(3)], axis=-1).astype(np.uint8)
+        reachable = dist != INF_DIST
+        colors[~reachable] = HEATMAP_UNREACHABLE_COLOR
+
+        return colors, reachable
+
+    def draw_flow_arrows(self, min_row, max_row, min_col, max_col):
+        # A line from every visible cell towards the next cell of its flow, with a dot at the head
+        cell_size = self.get_cell_size()
+        direction = self.flow_field.direction[min_row:max_row, min_col:max_col]
+        for row, col in np.argwhere(direction != NO_DIRECTION):
+            dr, dc = DIRECTIONS[direction[row, col]]
+            x, y = self.get_node_pos(min_row + row, min_col + col)
+            center_x, center_y = x + cell_size / 2, y + cell_size / 2
+            tail = (center_x - dc * cell_size * 0.25, center_y - dr * cell_size * 0.25)
+            head = (center_x + dc * cell_size * 0.3, center_y + dr * cell_size * 0.3)
+            pygame.draw.line(self.surface, FLOW_ARROW_COLOR, tail, head)
+            pygame.draw.circle(self.surface, FLOW_ARROW_COLOR, head, max(1, cell_size / 10))
+
+    def create_gridline_overlay(self):
+        min_row, max_row, min_col, max_col = self.get_visible_cells()
+        left, top = self.get_node_pos(min_row, min_col)
+        right, bottom = self.get_node_pos(max_row, max_col)
+
+        overlay = pygame.Surface(self.surface.get_size())
+        overlay.fill(GRIDLINE_COLORKEY)
+        overlay.set_colorkey(GRIDLINE_COLORKEY)
+        for col in range(min_col, max_col + 1):
+            x, _ = self.get_node_pos(min_row, col)
+            pygame.draw.line(overlay, LINE_COLOR, (x, top), (x, bottom))
+        for row in range(min_row, max_row + 1):
+            _, y = self.get_node_pos(row, min_col)
+            pygame.draw.line(overlay, LINE_COLOR, (left, y), (right, y))
+
+        return overlay
+
+    def shows_gridlines(self):
+        return self.gridlines and self.get_cell_size() >= MIN_GRIDLINE_CELL_SIZE
+
+    def blit(self, screen):
+        window = screen.window
+        origin = self.get_origin(window)
+        window.blit(self.surface, origin)
+        screen.renderer.mark_dirty(pygame.Rect(origin, self.surface.get_size()))
 
     def resize_nodes(self, window):
-        self.node_size = round(get_grid_size(window, self) / self.size)
+        self.node_size = get_grid_size(window, self) / max(self.rows, self.cols)
+        self.surface = self.create_surface()
+        self.gridline_overlay = None
+
+    def create_surface(self):
+        # One extra pixel for the gridlines on the right and bottom edges
+        width, height = round(self.cols * self.node_size), round(self.rows * self.node_size)
+
+        return pygame.Surface((width + 1, height + 1))
+
+    def get_origin(self, window):
+        """
+            Returns the window position of the viewport, non-square graphs are centered in the grid area.
+        """
+        grid_size = get_grid_size(window, self)
+        width, height = self.surface.get_size()
+
+        return (get_side_tab_size(window, self) + (grid_size + 1 - width) // 2,
+                get_tb_tab_size(window, self) + (grid_size + 1 - height) // 2)
+
+    def get_cell_size(self):
+        return self.node_size * self.zoom
+
+    def get_node_pos(self, row, col):
+        """
+            Returns the position of the top left corner of a node relative to the viewport.
+        """
+        cell_size = self.get_cell_size()
+
+        return round((col - self.view_col) * cell_size), round((row - self.view_row) * cell_size)
+
+    def get_visible_cells(self):
+        """
+            Returns the row and column ranges (min inclusive, max exclusive) of the cells in the viewport.
+        """
+        return (int(self.view_row), min(self.rows, ceil(self.view_row + self.rows / self.zoom)),
+                int(self.view_col), min(self.cols, ceil(self.view_col + self.cols / self.zoom)))
+
+    def zoom_at(self, window, pos, factor):
+        """
+            Multiplies the zoom by factor, keeping the point of the graph under pos in place.
+        """
+        max_zoom = max(1, max(self.rows, self.cols) / MIN_VISIBLE_CELLS)
+        new_zoom = min(max(self.zoom * factor, 1), max_zoom)
+
+        origin_x, origin_y = self.get_origin(window)
+        x, y = pos[0] - origin_x, pos[1] - origin_y
+        cell_size, new_cell_size = self.get_cell_size(), self.node_size * new_zoom
+        self.view_col += x / cell_size - x / new_cell_size
+        self.view_row += y / cell_size - y / new_cell_size
+        self.zoom = new_zoom
+        self.clamp_view()
+
+    def pan(self, dx, dy):
+        # Moves the graph by (dx, dy) pixels
+        cell_size = self.get_cell_size()
+        self.view_col -= dx / cell_size
+        self.view_row -= dy / cell_size
+        self.clamp_view()
+
+    def clamp_view(self):
+        self.view_row = min(max(self.view_row, 0), self.rows - self.rows / self.zoom)
+        self.view_col = min(max(self.view_col, 0), self.cols - self.cols / self.zoom)
 
     def search(self, screen):
         self.clear()
         screen.animate = False
         self.draw(screen, update=True)
         screen.animate = True
-        if screen.selected_algorithm == "BFS":
-            return bfs(screen)
-        elif screen.selected_algorithm == "DFS":
-            return dfs(screen)
-        elif screen.selected_algorithm == "Dijkstra's":
-            return dijkstras(screen)
-        elif screen.selected_algorithm == "A*":
-            return astar(screen)
-
-    def generate_maze(self, screen, selected_maze):
+
+        if screen.selected_algorithm in PATHFINDING_ALGORITHMS:
+            # The same search on an unchanged grid replays the cached result, its stats keep
+            # the compute time of the search that produced it
+            key = self.search_key(screen.selected_algorithm)
+            cached = screen.result_cache.get(key)
+            if cached:
+                result, status = cached
+                stats = copy(result.stats)
+                stats.cached = True
+                status += " (cached)"
+            else:
+                grid = self.snapshot()
+                result = instrumented_search(screen.selected_algorithm, grid)
+                stats = result.stats
+                status = f"{screen.selected_algorithm} expanded {result.expanded} nodes"
+                # Jump point searches look at far more cells than they expand, so they report both
+                # and their time, next to A* on the same grid without weights
+                if screen.selected_algorithm.startswith("JPS"):
+                    status += f" and scanned {result.scanned} cells in {stats.compute_time * 1000:.1f} ms"
+                if screen.selected_algorithm == "JPS":
+                    uniform_grid = SearchGrid(grid.size, grid.barriers, grid.start, grid.end,
+                                              adjacency=grid.adjacency)
+                    astar_stats = instrumented_search("A*", uniform_grid).stats
+                    status += f" (A*: {astar_stats.expanded} in {astar_stats.compute_time * 1000:.1f} ms)"
+                screen.result_cache.put(key, (result, status), result_size(result))
+            screen.set_status(status)
+
+            self.store_search_tree(result)
+            start_time = perf_counter()
+            play(screen, self.replay(result), finish=lambda count: self.mark_visited(result, count))
+            stats.animation_time = perf_counter() - start_time
+            screen.add_stats(stats)
+            if result.path:
+                return [self.get_node(*divmod(index, self.cols)) for index in result.path]
+
+    def snapshot(self):
+        """
+            Builds a pygame-free SearchGrid of the current barriers, start and end (None if not set).
+        """
+        barriers = (self.state == BARRIER_STATE).ravel().tolist()
+        start = self.start.row * self.cols + self.start.col if self.start else None
+        end = self.end.row * self.cols + self.end.col if self.end else None
+        weights = self.weight.ravel().tolist()
+        adjacency = self.adjacency.ravel().tolist()
+
+        return SearchGrid(self.size, barriers, start, end, weights, adjacency)
+
+    def search_key(self, algorithm):
+        """
+            Identifies a search by everything its result depends on: the shape and content hash
+            of the graph (barriers and weights), the start and end nodes and the algorithm.
+        """
+        start = self.start.row * self.cols + self.start.col if self.start else None
+        end = self.end.row * self.cols + self.end.col if self.end else None
+
+        return self.rows, self.cols, self.content_hash, start, end, algorithm
+
+    def flip_barrier_hash(self, row, col):
+        # A cell turning into a barrier or back swaps its code between 0 and its weight, the same XOR both ways
+        index = row * self.cols + col
+        self.content_hash ^= cell_hash(index, 0) ^ cell_hash(index, int(self.weight[row, col]))
+
+    def rehash(self):
+        """
+            Recomputes the content hash from scratch after bulk changes of the state and weight arrays.
+        """
+        barriers = (self.state == BARRIER_STATE).ravel()
+        barrier_indices = np.flatnonzero(barriers)
+        weighted = np.flatnonzero(~barriers & (self.weight.ravel() != DEFAULT_WEIGHT))
+        barrier_hashes = cell_hashes(barrier_indices, np.zeros(len(barrier_indices), dtype=np.uint8))
+        self.content_hash = int(np.bitwise_xor.reduce(barrier_hashes)) ^ \
+            int(np.bitwise_xor.reduce(cell_hashes(weighted, self.weight.ravel()[weighted])))
+
+    def set_weight(self, row, col, weight):
+        old_weight = int(self.weight[row, col])
+        if weight != old_weight:
+            self.weight[row, col] = weight
+            if self.state[row, col] != BARRIER_STATE:
+                index = row * self.cols + col
+                self.content_hash ^= cell_hash(index, old_weight) ^ cell_hash(index, weight)
+
+    def store_search_tree(self, result):
+        """
+            Copies the distance and parent lists of a search into the grid arrays.
+        """
+        if result.dist is not None:
+            self.dist.flat = result.dist
+        if result.parents is not None:
+            self.parent.flat = result.parents
+
+    def replay(self, result):
+        """
+            Applies the stream of visited cells reported by a headless search, one node per step.
+        """
+        for i, index in enumerate(result.visited):
+            node = self.get_node(*divmod(index, self.cols))
+            node.set_visited(backward=bool(result.backward and result.backward[i]))
+            yield node
+
+    def mark_visited(self, result, first=0):
+        # Bulk replay() of the visits of a search from the first one on
+        mark_cells(self.state, *visited_cells(result, first))
+
+    def mark_path(self, path):
+        cells = np.array([node.row * self.cols + node.col for node in path], dtype=np.int64)
+        mark_cells(self.state, cells, np.full(len(cells), PATH_STATE, dtype=np.uint8))
+
+    def generate_maze(self, screen, selected_maze, animate=True):
+        """
+            Generates the selected maze from screen.seed, the same seed and start/end nodes
+            always give the same maze.
+        """
+        # Mazes too big to watch node by node are generated without animation
+        animate = animate and self.rows * self.cols <= MAX_ANIMATED_MAZE_CELLS
+        rng = Random(screen.seed)
+
         self.clear(save_barriers=False)
+        if selected_maze == "Random" and not animate:
+            # All barriers in one write and the grid in one blit
+            start_time = perf_counter()
+            self.set_barriers(random_barrier_mask(self, rng=rng))
+            self.report_maze(screen, selected_maze, perf_counter() - start_time)
+            self.draw(screen, update=True)
+            return
+
+        # Only the time spent in the generator counts, not drawing and waiting for frames
+        steps = StepTimer(self.maze_steps(selected_maze, rng))
         screen.animate = False
-        screen.delay_multiplier = MAZE_DELAY_MULTIPLIER
         self.draw(screen)
+        screen.animate = True
+        if animate:
+            play(screen, steps, MAZE_DELAY_MULTIPLIER)
+        else:
+            deque(steps, maxlen=0)
+            self.draw(screen, update=True)
+        self.report_maze(screen, selected_maze, steps.elapsed)
+
+    def maze_steps(self, selected_maze, rng):
+        """
+            Prepares the (cleared) graph for the selected maze and returns its generator.
+        """
         if selected_maze == "Random":
-            screen.animate = True
-            random_maze(screen)
-        elif selected_maze == "Backtrack":
-            self.fill()
-            self.draw(screen)
-            screen.animate = True
-            backtrack(screen, 1, 1)
+            return random_maze(self, rng=rng)
         elif selected_maze == "Division":
-            screen.animate = True
-            divide(screen, 0, self.size-1, 0, self.size-1)
-            self.add_border(screen, depth=0)
+            return chain(divide(self, 0, self.cols-1, 0, self.rows-1, rng),
+                         self.add_border(depth=0))
+
+        # The rest are passage adders, starting with a graph full of barriers
+        self.fill()
+        if selected_maze == "Backtrack":
+            return backtrack(self, 1, 1, rng)
         elif selected_maze == "Prim's":
-            self.fill()
-            self.draw(screen)
-            screen.animate = True
-            prims(screen)
+            return prims(self, rng)
+        elif selected_maze == "Kruskal's":
+            return kruskals(self, rng)
+        elif selected_maze == "Eller's":
+            return ellers(self, rng)
+        elif selected_maze == "Wilson's":
+            return wilsons(self, rng)
 
-        screen.reset_delay_multiplier()
+    def report_maze(self, screen, selected_maze, elapsed):
+        screen.set_status(f"{selected_maze} maze, seed {screen.seed}, generated in {elapsed * 1000:.0f} ms")
 
     def get_grid_pos(self, window, pos):
         """
-            Turns (x,y) position on the screen to its respective (row, col) coords on the grid.
+            Turns (x,y) position on the screen to its respective (col, row) coords on the grid,
+            positions outside of the viewport give (-1, -1).
         """
         x, y = pos
-        col = (y - get_tb_tab_size(window, self)) // self.node_size
-        row = (x - get_side_tab_size(window, self)) // self.node_size
+        origin_x, origin_y = self.get_origin(window)
+        width, height = self.surface.get_size()
+        if not (0 <= x - origin_x < width - 1 and 0 <= y - origin_y < height - 1):
+            return -1, -1
 
-        return row, col
+        cell_size = self.get_cell_size()
+        col = floor(self.view_col + (x - origin_x) / cell_size)
+        row = floor(self.view_row + (y - origin_y) / cell_size)
 
-    def fill(self):
-        for row in self.grid:
-            for node in row:
-                node.set_barrier()
+        return col, row
 
-    def add_border(self, screen, depth=0):
-        for i in range(self.size):
+    def get_node(self, row, col):
+        return GraphNode(self, row, col)
 
-            self.grid[depth][i].set_barrier()
-            self.grid[depth][i].draw(screen)
+    def fill(self):
+        self.state[(self.state != START_STATE) & (self.state != END_STATE)] = BARRIER_STATE
+        self.rebuild_adjacency()
+        self.rehash()
+
+    def set_barriers(self, mask):
+        # Bulk set_barrier() for every node in a (rows, cols) boolean mask
+        mask = mask & (self.state != START_STATE) & (self.state != END_STATE)
+        self.state[mask] = BARRIER_STATE
+        self.weight[mask] = DEFAULT_WEIGHT
+        self.rebuild_adjacency()
+        self.rehash()
+
+    def rebuild_adjacency(self):
+        """
+            Recomputes every cell's bitmask of open directions after bulk changes of the state array.
+        """
+        open_cells = (self.state != BARRIER_STATE).astype(np.uint8)
+        self.adjacency.fill(0)
+        for bit, (dr, dc) in enumerate(DIRECTIONS):
+            # A cell gets the bit when its neighbor in direction (dr, dc) is in bounds and open
+            rows_to, rows_from = shifted_slices(dr, self.rows)
+            cols_to, cols_from = shifted_slices(dc, self.cols)
+            self.adjacency[rows_to, cols_to] |= open_cells[rows_from, cols_from] << bit
+
+    def update_adjacency(self, row, col):
+        """
+            Updates the masks of the neighbors of a single cell that became or stopped being a barrier.
+        """
+        is_open = self.state[row, col] != BARRIER_STATE
+        for bit, (dr, dc) in enumerate(DIRECTIONS):
+            new_row, new_col = row - dr, col - dc
+            if self.is_valid_node(new_row, new_col):
+                if is_open:
+                    self.adjacency[new_row, new_col] |= 1 << bit
+                else:
+                    self.adjacency[new_row, new_col] &= ALL_DIRECTIONS_MASK ^ (1 << bit)
 
-            self.grid[self.size-1-depth][i].set_barrier()
-            self.grid[self.size-1-depth][i].draw(screen)
+    def add_border(self, depth=0):
+        """
+            Turns the ring of nodes depth away from the edges into barriers, yielding each node.
+        """
+        for i in range(max(self.rows, self.cols)):
+            positions = []
+            if i < self.cols:
+                positions += [(depth, i), (self.rows-1-depth, i)]
+            if i < self.rows:
+                positions += [(i, depth), (i, self.cols-1-depth)]
+
+            for row, col in positions:
+                node = self.get_node(row, col)
+                node.set_barrier()
+                yield node
 
-            self.grid[i][depth].set_barrier()
-            self.grid[i][depth].draw(screen)
+    def show_flow_field(self):
+        """
+            Sweeps the whole graph towards the end node and shows the distances and directions
+            of the flow as a heatmap until the graph changes.
+        """
+        self.clear()
+        self.flow_field = FlowField(self.snapshot(), [self.end.row * self.cols + self.end.col])
 
-            self.grid[i][self.size-1-depth].set_barrier()
-            self.grid[i][self.size-1-depth].draw(screen)
+    def hide_flow_field(self):
+        self.flow_field = None
 
     def clear(self, save_barriers=True):
-        for row in range(self.size):
-            for col in range(self.size):
-                node = self.grid[row][col]
-                if (node.is_barrier() and save_barriers) or node.is_start() or node.is_end():
-                    node.reset(keep_color=True)
-                else:
-                    node.reset(keep_color=False)
+        self.hide_flow_field()
+        keep = (self.state == START_STATE) | (self.state == END_STATE)
+        if save_barriers:
+            keep |= self.state == BARRIER_STATE
+        self.state[~keep] = FREE_STATE
+        if not save_barriers:
+            self.weight.fill(DEFAULT_WEIGHT)
+            self.rebuild_adjacency()
+            self.rehash()
+        self.dist.fill(INF_DIST)
+        self.parent.fill(NO_PARENT)
 
     def reset(self):
-        self.grid = [[GraphNode(row, col) for col in range(self.size)]
-                     for row in range(self.size)]
+        self.hide_flow_field()
+        self.state.fill(FREE_STATE)
+        self.weight.fill(DEFAULT_WEIGHT)
+        self.rebuild_adjacency()
+        self.content_hash = 0
+        self.dist.fill(INF_DIST)
+        self.parent.fill(NO_PARENT)
         self.reset_start()
         self.reset_end()
 
     def toggle_gridlines(self):
         self.gridlines = not self.gridlines
 
-    def select_node(self, node):
+    def select_node(self, node, weighted=False):
         if not self.start:
             self.set_start(node)
         elif not self.end and not node.is_start():
             self.set_end(node)
+        elif weighted:
+            node.set_weight(WEIGHTED_NODE_COST)
         else:
             node.set_barrier()
 
@@ -131,7 +572,7 @@ class Graph:
         node.set_free()
 
     def is_valid_node(self, row, col, offset=0):
-        return offset <= row < (self.size - offset) and offset <= col < (self.size - offset)
+        return offset <= row < (self.rows - offset) and offset <= col < (self.cols - offset)
 
     def get_start(self):
         return self.start
@@ -155,122 +596,161 @@ class Graph:
 
 
 class GraphNode:
-    def __init__(self, row, col):
+    """
+        Lightweight view of a single cell; all of its data lives in the arrays of its Graph.
+    """
+    __slots__ = ("graph", "row", "col")
+
+    def __init__(self, graph, row, col):
+        self.graph = graph
         self.row = row
         self.col = col
-        self.color = FREE_COLOR
-        self.path = []
-        self.source_dist = inf
-        self.target_dist = inf
 
-    def __lt__(self, other):
-        if self.target_dist is not inf:
-            return self.target_dist < other.target_dist
+    @property
+    def state(self):
+        return self.graph.state[self.row, self.col]
+
+    @state.setter
+    def state(self, new_state):
+        was_barrier = self.graph.state[self.row, self.col] == BARRIER_STATE
+        self.graph.state[self.row, self.col] = new_state
+        if was_barrier != (new_state == BARRIER_STATE):
+            self.graph.update_adjacency(self.row, self.col)
+            self.graph.flip_barrier_hash(self.row, self.col)
 
-        return self.source_dist < other.source_dist
+    @property
+    def color(self):
+        state = self.state
+        if state == FREE_STATE and self.is_weighted():
+            return WEIGHT_COLOR
+
+        return STATE_COLORS[state]
 
     def draw(self, screen):
         window, graph = screen.window, screen.graph
+        surface = graph.surface
 
-        y = get_tb_tab_size(window, graph) + self.row * graph.node_size
-        x = get_side_tab_size(window, graph) + self.col * graph.node_size
+        x, y = graph.get_node_pos(self.row, self.col)
+        next_x, next_y = graph.get_node_pos(self.row + 1, self.col + 1)
+        # Nodes smaller than a pixel still take up one
+        width, height = max(next_x - x, 1), max(next_y - y, 1)
 
-        pygame.draw.rect(window, self.color,
-                         (x, y, graph.node_size, graph.node_size))
+        # Gridlines on the right and bottom edges are one pixel outside the node
+        area = pygame.Rect(x, y, width + 1, height + 1).clip(surface.get_rect())
+        if not area:
+            return
 
-        if graph.gridlines:
-            pygame.draw.line(window, LINE_COLOR, (x, y),
-                             (x + graph.node_size, y))
+        pygame.draw.rect(surface, self.color, (x, y, width, height))
 
-            pygame.draw.line(window, LINE_COLOR, (x, y),
-                             (x, y + graph.node_size))
+        if graph.shows_gridlines():
+            pygame.draw.line(surface, LINE_COLOR, (x, y),
+                             (x + width, y))
 
-            pygame.draw.line(window, LINE_COLOR, (x + graph.node_size, y),
-                             (x + graph.node_size, y + graph.node_size))
+            pygame.draw.line(surface, LINE_COLOR, (x, y),
+                             (x, y + height))
 
-            pygame.draw.line(window, LINE_COLOR, (x, y + graph.node_size),
-                             (x + graph.node_size, y + graph.node_size))
+            pygame.draw.line(surface, LINE_COLOR, (x + width, y),
+                             (x + width, y + height))
 
-        if screen.animate:
-            pygame.display.update()
-            pygame.time.delay(DELAYS[screen.animation_speed]
-                              [graph.size] * screen.delay_multiplier)
+            pygame.draw.line(surface, LINE_COLOR, (x, y + height),
+                             (x + width, y + height))
 
-    def get_neighbors(self, graph):
-        def valid_neighbor(row, col):
-            return graph.is_valid_node(row, col) and not graph.grid[row][col].is_barrier()
+        # Copy the node from the grid layer to the window
+        origin_x, origin_y = graph.get_origin(window)
+        dest = (origin_x + area.x, origin_y + area.y)
+        window.blit(surface, dest, area)
+        screen.renderer.mark_dirty(pygame.Rect(dest, area.size))
 
-        neighbors = []
-        for dr, dc in DIRECTIONS:
-            if valid_neighbor(self.row+dr, self.col+dc):
-                neighbors.append(graph.grid[self.row+dr][self.col+dc])
+    def get_neighbors(self, graph):
+        mask = graph.adjacency[self.row, self.col]
 
-        return neighbors
+        return [graph.get_node(self.row+dr, self.col+dc)
+                for bit, (dr, dc) in enumerate(DIRECTIONS) if mask & (1 << bit)]
 
     def get_path(self):
-        return self.path
+        path = []
+        parent = self.get_parent()
+        while parent:
+            path.append(parent)
+            parent = parent.get_parent()
+        path.reverse()
+
+        return path
 
     def get_parent(self):
-        return self.path[-1]
+        parent = self.graph.parent[self.row, self.col]
+        if parent == NO_PARENT:
+            return None
+
+        return self.graph.get_node(*divmod(int(parent), self.graph.cols))
 
     def get_source_dist(self):
-        return self.source_dist
+        return self.graph.dist[self.row, self.col]
 
-    def get_target_dist(self):
-        return self.target_dist
+    def get_weight(self):
+        return self.graph.weight[self.row, self.col]
 
-    def update_path(self, new_path):
-        self.path = new_path
+    def set_weight(self, new_weight):
+        if not self.is_barrier() and not self.is_start() and not self.is_end():
+            self.graph.set_weight(self.row, self.col, new_weight)
 
-    def update_parent(self, new_parent):
-        if self.path:
-            self.path.pop()
+    def is_weighted(self):
+        return self.get_weight() != DEFAULT_WEIGHT
 
-        self.path.append(new_parent)
+    def update_parent(self, new_parent):
+        self.graph.parent[self.row, self.col] = new_parent.row * self.graph.cols + new_parent.col
 
     def update_source_dist(self, new_source_dist):
-        self.source_dist = new_source_dist
-
-    def update_target_dist(self, new_target_dist):
-        self.target_dist = new_target_dist
+        self.graph.dist[self.row, self.col] = new_source_dist
 
     def get_pos(self):
         return self.row, self.col
 
     def set_start(self):
-        self.color = START_COLOR
+        self.state = START_STATE
 
     def set_end(self):
-        self.color = END_COLOR
+        self.state = END_STATE
 
     def set_free(self):
-        self.color = FREE_COLOR
+        self.state = FREE_STATE
+        self.graph.set_weight(self.row, self.col, DEFAULT_WEIGHT)
 
     def set_barrier(self):
         if not self.is_end() and not self.is_start():
-            self.color = BARRIER_COLOR
+            self.state = BARRIER_STATE
+            # Barriers hash the same whatever their weight, so this leaves the content hash alone
+            self.graph.weight[self.row, self.col] = DEFAULT_WEIGHT
+
+    def set_visited(self, backward=False):
+        if not self.is_start() and not self.is_end():
+            self.state = VISITED_BACKWARD_STATE if backward else VISITED_STATE
+
+    def set_path(self):
+        if not self.is_start() and not self.is_end():
+            self.state = PATH_STATE
 
-    def set_visited(self):
+    def set_path_head(self):
         if not self.is_start() and not self.is_end():
-            self.color = VISITED_COLOR
+            self.state = PATH_HEAD_STATE
 
     def is_start(self):
-        return self.color == START_COLOR
+        return self.state == START_STATE
 
     def is_end(self):
-        return self.color == END_COLOR
+        return self.state == END_STATE
 
     def is_free(self):
-        return self.color == FREE_COLOR
+        return self.state == FREE_STATE
 
     def is_barrier(self):
-        return self.color == BARRIER_COLOR
+        return self.state == BARRIER_STATE
 
     def been_visited(self):
-        return self.color == VISITED_COLOR
+        return self.state == VISITED_STATE or self.state == VISITED_BACKWARD_STATE
 
     def reset(self, keep_color=True):
         if not keep_color:
-            self.color = FREE_COLOR
-        self.source_dist = inf
-        self.target_dist = inf
+            self.state = FREE_STATE
+        self.graph.dist[self.row, self.col] = INF_DIST
+        self.graph.parent[self.row, self.col] = NO_PARENT
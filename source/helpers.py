@@ -1,6 +1,43 @@
 from constants import *
 
 import pygame
+from collections import deque, OrderedDict
+from math import sqrt
+from time import perf_counter
+import os
+import csv
+
+
+# SysFont lookups and rendered labels are cached, keyed by everything that affects them;
+# Screen.resize clears both since every size changes with the window. Status lines and stats
+# are new text every run, so only the TEXT_CACHE_SIZE most recently used labels are kept.
+font_cache = {}
+text_cache = OrderedDict()
+
+
+def get_font(size, font=FONT):
+    key = (font, size)
+    if key not in font_cache:
+        font_cache[key] = pygame.font.SysFont(font, size)
+
+    return font_cache[key]
+
+
+def render_text(text, size, color, font=FONT):
+    key = (font, size, text, color)
+    if key in text_cache:
+        text_cache.move_to_end(key)
+    else:
+        text_cache[key] = get_font(size, font).render(text, True, color)
+        if len(text_cache) > TEXT_CACHE_SIZE:
+            text_cache.popitem(last=False)
+
+    return text_cache[key]
+
+
+def clear_text_cache():
+    font_cache.clear()
+    text_cache.clear()
 
 
 # Helper function for handling events within algorithms
@@ -40,9 +77,56 @@ def run_checks(screen):
 
 def save_settings(screen):
     with open("settings.txt", "w") as file:
-        file.write(f"{screen.graph.size} ")
+        file.write(f"{format_graph_size(screen.graph.size)} ")
         file.write(f"{int(screen.graph.gridlines)} ")
-        file.write(f"{screen.animation_speed}")
+        file.write(f"{screen.animation_speed} ")
+        file.write(f"{screen.seed}")
+
+
+# Appends the stats of every run since the last export to SEARCH_STATS_FILE (header only for a new file)
+def export_search_stats(screen):
+    runs = screen.stats_history[screen.exported_stats:]
+    if not runs:
+        screen.set_status("No new runs to export")
+        return
+
+    new_file = not os.path.exists(SEARCH_STATS_FILE)
+    with open(SEARCH_STATS_FILE, "a", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=SEARCH_STATS_FIELDS)
+        if new_file:
+            writer.writeheader()
+        writer.writerows(stats.as_dict() for stats in runs)
+
+    screen.exported_stats = len(screen.stats_history)
+    screen.set_status(f"Exported {len(runs)} run(s) to {SEARCH_STATS_FILE}")
+
+
+# Graph sizes are written as "45" for square grids and "120x300" (rows x cols) otherwise
+def format_graph_size(size):
+    if isinstance(size, int):
+        return str(size)
+
+    return "x".join(str(side) for side in size)
+
+
+# Each side is clamped to 2..MAX_GRID_SIZE, text that is not one or two sides gives None
+def parse_graph_size(text):
+    try:
+        sides = [min(max(int(side), 2), MAX_GRID_SIZE) for side in text.split("x")]
+    except ValueError:
+        return None
+
+    if len(sides) > 2:
+        return None
+    if len(sides) == 1 or sides[0] == sides[1]:
+        return sides[0]
+
+    return tuple(sides)
+
+
+# Target and source slices for shifting an array axis of the given length by offset (for neighbor lookups)
+def shifted_slices(offset, length):
+    return slice(max(0, -offset), length - max(0, offset)), slice(max(0, offset), length - max(0, -offset))
 
 
 def get_updated_screen_dimensions(old_dimensions, new_dimensions):
@@ -65,10 +149,14 @@ def get_updated_screen_dimensions(old_dimensions, new_dimensions):
 
 def get_grid_size(window, graph):
     intended = round(min(window.get_size()) * 0.9)
-    node_size = round(intended / graph.size)
-    actual = node_size * graph.size
+    longer_side = max(graph.rows, graph.cols)
+    node_size = round(intended / longer_side)
+
+    # Rounding to whole pixels would distort big grids too much, their nodes are fractional
+    if node_size < MIN_WHOLE_NODE_SIZE:
+        return intended
 
-    return actual
+    return node_size * longer_side
 
 
 # Top and bottom tab size
@@ -107,48 +195,119 @@ def get_small_button_font_size(window):
     return round(get_small_button_size(window) * 0.95)
 
 
-def get_big_button_font_size(window):
-    _, big_button_height = get_big_button_size(window)
+def get_big_button_font_size(button_height):
+    return round(5/7 * button_height)
+
+
+def play(screen, steps, delay_multiplier=1, finish=None):
+    """
+        Frame-budgeted animation: draws the nodes yielded by steps, advancing as many of them per
+        frame as fit into FRAME_DURATION at the current speed (each step costs the delay of the
+        animation speed times delay_multiplier). Events are handled once per frame. After FINISH
+        finish(count) applies every step after the first count at once (without it the remaining
+        steps run without being drawn) and the whole grid is drawn a single time.
+    """
+    clock = pygame.time.Clock()
+    budget = 0
+    steps = iter(steps)
+    for count, node in enumerate(steps, 1):
+        node.draw(screen)
+
+        budget -= 1
+        while screen.animate and budget <= 0:
+            screen.renderer.flush()
+            clock.tick(FPS)
+            run_checks(screen)
+            step_delay = get_step_delay(screen) * delay_multiplier
+            budget += FRAME_DURATION / step_delay
+
+        if not screen.animate:
+            if finish:
+                finish(count)
+            else:
+                deque(steps, maxlen=0)
+            screen.graph.draw(screen, update=True)
+            break
+
+    screen.renderer.flush()
+
+
+def get_step_delay(screen):
+    cell_count = screen.graph.rows * screen.graph.cols
+    delay = min(DELAY_SCALE / sqrt(cell_count) ** DELAY_EXPONENT,
+                MAX_ANIMATION_DURATION / cell_count)
+
+    return SPEED_FACTORS[screen.animation_speed] * delay
+
+
+class StepTimer:
+    """
+        Iterates over steps, adding up the time spent producing them (and not drawing them) in elapsed.
+    """
+
+    def __init__(self, steps):
+        self.steps = iter(steps)
+        self.elapsed = 0
 
-    return round(5/7 * big_button_height)
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        start_time = perf_counter()
+        try:
+            return next(self.steps)
+        finally:
+            self.elapsed += perf_counter() - start_time
 
 
 def draw_path(screen, path):
+    # Shorter paths are drawn slower (at most MAX_PATH_DELAY per node)
     graph = screen.graph
+    delay_multiplier = min(MAX_PATH_DELAY / get_step_delay(screen),
+                           16 * max(graph.rows, graph.cols) / len(path))
+
+    play(screen, path_steps(path), delay_multiplier, lambda count: screen.graph.mark_path(path))
+
+
+def path_steps(path):
     prev = path[0]
     for node in path[1:]:
-        run_checks(screen)
         if not prev.is_start():
-            prev.color = PATH_COLOR
-            prev.draw(screen)
+            prev.set_path()
+            yield prev
         if not node.is_start() and not node.is_end():
-            node.color = YELLOW
-            node.draw(screen)
+            node.set_path_head()
+            yield node
             prev = node
 
-        if screen.animate:
-            # Delay based on length relative to GRAPH_SIZE and base delay
-            delay = round(4 * graph.size / len(path) * 4 *
-                          DELAYS[screen.animation_speed][graph.size])
-            if delay > 80:
-                delay = 80
-            pygame.time.delay(delay)
-
 
 def handle_no_path(screen):
-    font = pygame.font.SysFont(FONT, 120)
     window_width, window_height = screen.window.get_size()
-    label = font.render(
-        "PATH NOT FOUND!", True, RED)
+    label = render_text("PATH NOT FOUND!", 120, RED)
     label_rect = label.get_rect(
         center=(window_width // 2, window_height // 2))
 
     screen.window.blit(label, label_rect)
     pygame.display.update()
     pygame.time.delay(500)
+    screen.invalidate()
+
+
+# Draws the status line (e.g. statistics of the last run) centered in the bottom tab
+def draw_status(screen, surface):
+    window, graph = screen.window, screen.graph
+    window_width, _ = window.get_size()
+    tb_size = get_tb_tab_size(window, graph)
+
+    label = render_text(screen.status, get_legend_font_size(window, graph), LEGEND_FONT_COLOR)
+    label_rect = label.get_rect(
+        center=(window_width // 2, tb_size * 1.5 + get_grid_size(window, graph)))
+
+    surface.blit(label, label_rect)
 
 
 def update_size_buttons(screen):
+    screen.invalidate("buttons")
     for label, button in screen.buttons["size_buttons"].items():
         if screen.graph.size == label:
             button.select()
@@ -157,6 +316,7 @@ def update_size_buttons(screen):
 
 
 def update_animation_buttons(screen):
+    screen.invalidate("buttons")
     for label, button in screen.buttons["animation_buttons"].items():
         if label == screen.animation_speed:
             button.select()
@@ -165,6 +325,7 @@ def update_animation_buttons(screen):
 
 
 def update_gridline_buttons(screen):
+    screen.invalidate("buttons")
     grid_on = screen.buttons["gridline_buttons"]["GRID ON"]
     grid_off = screen.buttons["gridline_buttons"]["GRID OFF"]
     if screen.graph.gridlines:
@@ -175,19 +336,91 @@ def update_gridline_buttons(screen):
         grid_off.visible = True
 
 
+def update_brush_buttons(screen):
+    screen.invalidate("buttons")
+    walls = screen.buttons["brush_buttons"]["WALLS"]
+    weights = screen.buttons["brush_buttons"]["WEIGHTS"]
+    walls.visible = not screen.paint_weights
+    weights.visible = screen.paint_weights
+
+
 def update_pathfinding_buttons(screen):
+    screen.invalidate("buttons")
     for label, button in screen.buttons["pathfinding_buttons"].items():
-        if label == screen.selected_algorithm:
+        if label == screen.selected_algorithm or label in screen.race_algorithms:
             button.select()
         else:
             button.unselect()
 
 
+# Shows the flow field towards the end node as a heatmap, or hides it again
+def toggle_flow_field(screen):
+    graph = screen.graph
+    if graph.flow_field is not None:
+        graph.hide_flow_field()
+    elif graph.end:
+        start_time = perf_counter()
+        graph.show_flow_field()
+        elapsed = perf_counter() - start_time
+        flow_field = graph.flow_field
+        screen.set_status(f"Flow field: {flow_field.reachable} nodes reach the end, "
+                          f"the farthest at cost {flow_field.max_dist} ({elapsed * 1000:.0f} ms)")
+    else:
+        screen.set_status("Select an end node first")
+
+    screen.invalidate("grid")
+
+
+# G opens a prompt in the status line for any graph size, typed like in "settings.txt"
+def start_size_input(screen):
+    screen.size_input = ""
+    show_size_input(screen)
+
+
+def show_size_input(screen):
+    screen.set_status(f"Graph size (e.g. 500 or 120x300): {screen.size_input}_   Enter to apply, Esc to cancel")
+
+
+def edit_size_input(screen, event):
+    if event.key == pygame.K_ESCAPE:
+        screen.size_input = None
+        screen.set_status("")
+    elif event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
+        size = parse_graph_size(screen.size_input)
+        screen.size_input = None
+        if size is None:
+            screen.set_status("Invalid graph size")
+        else:
+            screen.update_graph_size(size)
+            update_size_buttons(screen)
+            screen.set_status(f"Graph size {format_graph_size(size)}")
+    else:
+        if event.key == pygame.K_BACKSPACE:
+            screen.size_input = screen.size_input[:-1]
+        elif event.unicode and event.unicode in "0123456789xX":
+            screen.size_input += event.unicode.lower()
+        show_size_input(screen)
+
+
+# Adds the algorithm to the race or takes it out, a race starts with the selected algorithm
+def toggle_race_algorithm(screen, label):
+    race_algorithms = screen.race_algorithms
+    if not race_algorithms and screen.selected_algorithm:
+        race_algorithms.append(screen.selected_algorithm)
+
+    if label in race_algorithms:
+        race_algorithms.remove(label)
+    else:
+        race_algorithms.append(label)
+    screen.selected_algorithm = race_algorithms[-1] if race_algorithms else None
+
+
 def toggle_gridline_buttons(screen):
     grid_on = screen.buttons["gridline_buttons"]["GRID ON"]
     grid_off = screen.buttons["gridline_buttons"]["GRID OFF"]
 
     screen.graph.gridline = not screen.graph.gridlines
+    screen.invalidate("grid", "buttons")
     grid_on.visible = not grid_on.visible
     grid_off.visible = not grid_off.visible
     current_time = pygame.time.get_ticks()
@@ -197,8 +430,20 @@ def toggle_gridline_buttons(screen):
     screen.draw_buttons()
 
 
+def toggle_brush_buttons(screen):
+    screen.paint_weights = not screen.paint_weights
+    update_brush_buttons(screen)
+
+    current_time = pygame.time.get_ticks()
+    for button in screen.buttons["brush_buttons"].values():
+        button.last_click_time = current_time
+
+    screen.draw_buttons()
+
+
 def toggle_run_finish_buttons(screen):
     run, finish = screen.buttons["action_buttons"]["RUN"], screen.buttons["action_buttons"]["FINISH"]
+    screen.invalidate("buttons")
     run.visible = not run.visible
     finish.visible = not finish.visible
 
@@ -0,0 +1,98 @@
+class IndexedHeap:
+    """
+        Binary min-heap that tracks the position of every item, so membership checks are O(1)
+        and decrease-key is O(log n). Equal priorities are popped in insertion order.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.positions = {}
+        self.counter = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __bool__(self):
+        return bool(self.heap)
+
+    def __contains__(self, item):
+        return item in self.positions
+
+    def push(self, item, priority):
+        """
+            Inserts item, or lowers its priority if it is already queued with a higher one.
+        """
+        if item in self.positions:
+            self.decrease_key(item, priority)
+            return
+
+        self.heap.append(((priority, self.counter), item))
+        self.positions[item] = len(self.heap) - 1
+        self.counter += 1
+        self._sift_up(len(self.heap) - 1)
+
+    def pop(self):
+        """
+            Removes and returns the (item, priority) pair with the lowest priority.
+        """
+        heap = self.heap
+        (priority, _), item = heap[0]
+        last = heap.pop()
+        del self.positions[item]
+
+        if heap:
+            heap[0] = last
+            self.positions[last[1]] = 0
+            self._sift_down(0)
+
+        return item, priority
+
+    def peek(self):
+        (priority, _), item = self.heap[0]
+
+        return item, priority
+
+    def get_priority(self, item):
+        return self.heap[self.positions[item]][0][0]
+
+    def decrease_key(self, item, priority):
+        position = self.positions[item]
+        (old_priority, order), _ = self.heap[position]
+        if priority < old_priority:
+            self.heap[position] = ((priority, order), item)
+            self._sift_up(position)
+
+    def _sift_up(self, position):
+        heap, positions = self.heap, self.positions
+        entry = heap[position]
+        while position > 0:
+            parent = (position - 1) >> 1
+            if entry[0] < heap[parent][0]:
+                heap[position] = heap[parent]
+                positions[heap[position][1]] = position
+                position = parent
+            else:
+                break
+
+        heap[position] = entry
+        positions[entry[1]] = position
+
+    def _sift_down(self, position):
+        heap, positions = self.heap, self.positions
+        size = len(heap)
+        entry = heap[position]
+        while True:
+            child = 2 * position + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1][0] < heap[child][0]:
+                child += 1
+            if heap[child][0] < entry[0]:
+                heap[position] = heap[child]
+                positions[heap[position][1]] = position
+                position = child
+            else:
+                break
+
+        heap[position] = entry
+        positions[entry[1]] = position
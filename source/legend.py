@@ -7,31 +7,39 @@ import pygame
 class Legend:
     def __init__(self) -> None:
         self.nodes = []
+        self.stats_panel = None
 
-    def draw(self, window, graph):
+    def draw(self, window, graph, stats=None):
+        """
+            Draws the legend, with the stats of a search run (if given) in place of the node key.
+        """
         for node in self.nodes:
-            node.draw(window, graph)
+            if stats is None or not node.in_key:
+                node.draw(window, graph)
+
+        if stats is not None and self.stats_panel:
+            self.stats_panel.draw(window, graph, stats)
 
     def add_node(self, node):
         self.nodes.append(node)
 
 
 class LegendNode:
-    def __init__(self, label, x, y, color=None, action="") -> None:
+    def __init__(self, label, x, y, color=None, action="", in_key=True) -> None:
         self.label = label
         self.x = x
         self.y = y
         self.color = color
         self.action = action
+        self.in_key = in_key
 
     def draw(self, window, graph):
-        font = pygame.font.SysFont(FONT, get_legend_font_size(window, graph))
+        font_size = get_legend_font_size(window, graph)
 
         if self.action != "" or self.color is not None:
-            label = font.render(self.action + " - " +
-                                self.label, True, LEGEND_FONT_COLOR)
+            label = render_text(self.action + " - " + self.label, font_size, LEGEND_FONT_COLOR)
         else:
-            label = font.render(self.label, True, LEGEND_FONT_COLOR)
+            label = render_text(self.label, font_size, LEGEND_FONT_COLOR)
 
         label_width, label_height = label.get_size()
 
@@ -49,6 +57,39 @@ class LegendNode:
         window.blit(label, label_rect)
 
 
+class StatsPanel:
+    def __init__(self, x, y, line_height) -> None:
+        self.x = x
+        self.y = y
+        self.line_height = line_height
+
+    def draw(self, window, graph, stats):
+        font_size = get_legend_font_size(window, graph)
+        for line, text in enumerate(format_stats(stats)):
+            label = render_text(text, font_size, LEGEND_FONT_COLOR)
+            window.blit(label, (self.x, self.y + line * self.line_height))
+
+
+def format_stats(stats):
+    if stats.path_length is not None:
+        path = f"{stats.path_length} (cost {stats.path_cost})"
+    else:
+        path = "n/a (visit order)" if stats.found else "no path"
+    animation = "-" if stats.animation_time is None else f"{stats.animation_time:.2f} s"
+    compute = f"{stats.compute_time * 1000:.1f} ms" + (" (cached)" if stats.cached else "")
+
+    return [stats.algorithm,
+            f"Expanded: {stats.expanded}",
+            f"Pushed: {stats.pushed}",
+            f"Max frontier: {stats.max_frontier}",
+            f"Visited: {stats.visited}",
+            f"Path: {path}",
+            f"Compute: {compute}",
+            f"Animation: {animation}",
+            "TAB - Show legend",
+            "E - Export stats"]
+
+
 def initialize_legend(screen):
     legend = Legend()
 
@@ -76,19 +117,23 @@ def initialize_legend(screen):
     y += diff
     legend.add_node(LegendNode("Path node", x, y, PATH_COLOR))
 
+    y += diff
+    legend.add_node(LegendNode("Weighted node", x, y, WEIGHT_COLOR))
+
     y += diff
     legend.add_node(LegendNode("Select a node", x, y, action="LMB"))
 
     y += diff * 0.8
     legend.add_node(LegendNode("Unselect a node",  x, y, action="RMB"))
+    legend.stats_panel = StatsPanel(legend.nodes[0].x, legend.nodes[0].y, diff * 0.85)
 
     y += 3.3 * diff
     x += get_side_tab_size(window, graph) * 0.25 - \
         get_legend_font_size(window, graph) * 0.15
-    legend.add_node(LegendNode("Graph size", x, y))
+    legend.add_node(LegendNode("Graph size", x, y, in_key=False))
 
     y += 2*diff
     x -= get_legend_font_size(window, graph) * 1.05
-    legend.add_node(LegendNode("Animation speed", x, y))
+    legend.add_node(LegendNode("Animation speed", x, y, in_key=False))
 
     screen.update_legend(legend)
@@ -1,6 +1,7 @@
 from constants import *
 from helpers import *
 from screen import initialize_screen
+from race import race
 
 import pygame
 
@@ -17,8 +18,8 @@ def main():
     clock = pygame.time.Clock()
 
     while True:
-        clock.tick(60)
-        screen.draw()
+        clock.tick(FPS)
+        screen.refresh()
         old_width, old_height = screen.window.get_size()
         graph = screen.graph
 
@@ -34,12 +35,42 @@ def main():
                     (new_width, new_height), pygame.RESIZABLE)
                 screen.resize(new_window)
 
+            # Any click ends a race and shows the graph again, clicks that may edit it hide its flow field
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                screen.end_race()
+                if event.button in (1, 3) and graph.flow_field is not None:
+                    graph.hide_flow_field()
+                    screen.invalidate("grid")
+
+            # TAB switches between the node legend and the stats of the last run, E exports the stats,
+            # H toggles the flow field heatmap, G opens the graph size prompt (which then takes all keys)
+            if event.type == pygame.KEYDOWN:
+                if screen.size_input is not None:
+                    edit_size_input(screen, event)
+                elif event.key == pygame.K_g:
+                    start_size_input(screen)
+                elif event.key == pygame.K_TAB and screen.stats_history:
+                    screen.toggle_stats()
+                elif event.key == pygame.K_e:
+                    export_search_stats(screen)
+                elif event.key == pygame.K_h:
+                    toggle_flow_field(screen)
+
+            # Mouse wheel zooms in and out of the graph, dragging with the middle button pans it
+            if event.type == pygame.MOUSEWHEEL:
+                graph.zoom_at(screen.window, pygame.mouse.get_pos(), ZOOM_STEP ** event.y)
+                screen.invalidate("grid")
+
+            if event.type == pygame.MOUSEMOTION and event.buttons[1]:
+                graph.pan(*event.rel)
+                screen.invalidate("grid")
+
             if pygame.mouse.get_pressed()[0]:
                 pos = pygame.mouse.get_pos()
                 col, row = graph.get_grid_pos(window, pos)
                 if graph.is_valid_node(row, col):
-                    node = graph.grid[row][col]
-                    graph.select_node(node)
+                    node = graph.get_node(row, col)
+                    graph.select_node(node, weighted=screen.paint_weights)
                     node.draw(screen)
                 else:
                     for label, button in screen.buttons["size_buttons"].items():
@@ -55,7 +86,12 @@ def main():
                     for label, button in screen.buttons["action_buttons"].items():
                         if button.clicked(pos):
                             if label == "RUN":
-                                if graph.start and graph.end and screen.selected_algorithm:
+                                if graph.start and graph.end and len(screen.race_algorithms) > 1:
+                                    toggle_run_finish_buttons(screen)
+                                    race(screen, screen.race_algorithms)
+                                    screen.animate = True
+                                    toggle_run_finish_buttons(screen)
+                                elif graph.start and graph.end and screen.selected_algorithm:
                                     toggle_run_finish_buttons(screen)
                                     path = graph.search(screen)
                                     screen.animate = True
@@ -67,21 +103,38 @@ def main():
 
                             elif label == "CLEAR":
                                 graph.clear()
+                                screen.set_status("")
+                                screen.invalidate("grid")
                             elif label == "RESET":
                                 screen.graph.reset()
+                                screen.set_status("")
+                                screen.invalidate("grid")
 
                     for button in screen.buttons["gridline_buttons"].values():
                         if button.clicked(pos):
                             toggle_gridline_buttons(screen)
                             graph.toggle_gridlines()
 
+                    for button in screen.buttons["brush_buttons"].values():
+                        if button.clicked(pos):
+                            toggle_brush_buttons(screen)
+
                     for label, button in screen.buttons["pathfinding_buttons"].items():
                         if button.clicked(pos):
-                            screen.selected_algorithm = label
+                            # CTRL-click picks several algorithms to race against each other
+                            if pygame.key.get_mods() & pygame.KMOD_CTRL:
+                                if event.type == pygame.MOUSEBUTTONDOWN:
+                                    toggle_race_algorithm(screen, label)
+                            else:
+                                screen.race_algorithms = []
+                                screen.selected_algorithm = label
                             update_pathfinding_buttons(screen)
 
                     for label, button in screen.buttons["maze_buttons"].items():
                         if button.clicked(pos):
+                            # Every maze gets a new seed, shift-click repeats the last one
+                            if not pygame.key.get_mods() & pygame.KMOD_SHIFT:
+                                screen.new_seed()
                             toggle_run_finish_buttons(screen)
                             graph.generate_maze(screen, label)
                             toggle_run_finish_buttons(screen)
@@ -89,7 +142,7 @@ def main():
             elif pygame.mouse.get_pressed()[2]:
                 col, row = graph.get_grid_pos(window, pygame.mouse.get_pos())
                 if graph.is_valid_node(row, col):
-                    node = graph.grid[row][col]
+                    node = graph.get_node(row, col)
                     graph.unselect_node(node)
                     node.draw(screen)
 
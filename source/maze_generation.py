@@ -1,154 +1,311 @@
 from constants import *
-from helpers import run_checks
+from union_find import UnionFind
 
-from random import choice, shuffle, randrange
+import random
 from math import floor
+import numpy as np
+
+
+# Every generator below edits the graph in place and yields each node it changes,
+# so the visualizer can animate them step by step (or simply exhaust them headless).
+# All randomness comes from rng, a random.Random (the random module by default), so the
+# same seed always produces the same maze
 
 
 # Prim's maze generator
-def prims(screen):
-    graph = screen.graph
-    grid = graph.grid
-    row, col = randrange(graph.size), randrange(graph.size)
+def prims(graph, rng=random):
+    row, col = rng.randrange(graph.rows), rng.randrange(graph.cols)
 
-    # [0] = middle node between current frontier and previous frontier
-    # [1] = current frontier
-    frontiers = [[(row, col), (row, col)]]
+    # (middle node between current frontier and previous frontier, current frontier)
+    frontiers = [((row, col), (row, col))]
 
     while frontiers:
-        run_checks(screen)
-
-        frontier = choice(frontiers)
-        frontiers.remove(frontier)
-        row, col = frontier.pop()
-        current = grid[row][col]
+        # Swap the picked frontier with the last one, so removing it is O(1)
+        index = rng.randrange(len(frontiers))
+        frontiers[index], frontiers[-1] = frontiers[-1], frontiers[index]
+        (mid_row, mid_col), (row, col) = frontiers.pop()
+        current = graph.get_node(row, col)
 
         if current.is_barrier():
-            mid_row, mid_col = frontier.pop()
-            mid = grid[mid_row][mid_col]
+            mid = graph.get_node(mid_row, mid_col)
 
             # Create a passage
             current.set_free()
-            current.draw(screen)
+            yield current
             if mid.is_barrier():
                 mid.set_free()
-                mid.draw(screen)
+                yield mid
 
             # If in the graph, add fontiers of the current frontier (with nodes in between them) to the list of frontiers
-            if (row >= 2 and grid[row-2][col].is_barrier()):
-                frontiers.append([(row-1, col), (row-2, col)])
-            if (col >= 2 and grid[row][col-2].is_barrier()):
-                frontiers.append([(row, col-1), (row, col-2)])
-            if (row < graph.size-2 and grid[row+2][col].is_barrier()):
-                frontiers.append([(row+1, col), (row+2, col)])
-            if (col < graph.size-2 and grid[row][col+2].is_barrier()):
-                frontiers.append([(row, col+1), (row, col+2)])
-
-
-# Recursive division maze generator
-def divide(screen, min_row, max_row, min_col,  max_col):
-    width, height = max_row - min_row, max_col - min_col
-    horizontal = choose_orientation(width, height)
-    grid = screen.graph.grid
-
-    if horizontal:
-        if width < 2:
-            return
-
-        # Randomly generate a wall
-        col = floor(randrange(min_col, max_col+1) / 2) * 2
-
-        # Randomly generate a hole
-        hole = floor(randrange(min_row, max_row+1) / 2) * 2 + 1
-
-        for row in range(min_row, max_row+1):
-            run_checks(screen)
-            current = grid[col][row]
-            if row == hole and not current.is_start() and not current.is_end():
-                current.set_free()
-            else:
-                current.set_barrier()
-
-            current.draw(screen)
-
-        divide(screen, min_row, max_row, min_col, col-1)
-        divide(screen, min_row, max_row, col+1, max_col)
-    else:
-        if height < 2:
-            return
+            if (row >= 2 and graph.get_node(row-2, col).is_barrier()):
+                frontiers.append(((row-1, col), (row-2, col)))
+            if (col >= 2 and graph.get_node(row, col-2).is_barrier()):
+                frontiers.append(((row, col-1), (row, col-2)))
+            if (row < graph.rows-2 and graph.get_node(row+2, col).is_barrier()):
+                frontiers.append(((row+1, col), (row+2, col)))
+            if (col < graph.cols-2 and graph.get_node(row, col+2).is_barrier()):
+                frontiers.append(((row, col+1), (row, col+2)))
+
+
+# Recursive division maze generator (with an explicit stack of the areas left to divide,
+# visited in the same order as the recursion would, so no recursion limit applies)
+def divide(graph, min_row, max_row, min_col, max_col, rng=random):
+    areas = [(min_row, max_row, min_col, max_col)]
+
+    while areas:
+        min_row, max_row, min_col, max_col = areas.pop()
+        width, height = max_row - min_row, max_col - min_col
+        horizontal = choose_orientation(width, height, rng)
+
+        if horizontal:
+            if width < 2:
+                continue
+
+            # Randomly generate a wall
+            col = floor(rng.randrange(min_col, max_col+1) / 2) * 2
+
+            # Randomly generate a hole
+            hole = floor(rng.randrange(min_row, max_row+1) / 2) * 2 + 1
 
-        # Randomly generate a wall
-        row = floor(randrange(min_row, max_row+1) / 2) * 2
+            for row in range(min_row, max_row+1):
+                current = graph.get_node(col, row)
+                if row == hole and not current.is_start() and not current.is_end():
+                    current.set_free()
+                else:
+                    current.set_barrier()
 
-        # Randomly generate a hole
-        hole = floor(randrange(min_col, max_col+1) / 2) * 2 + 1
+                yield current
 
-        for col in range(min_col, max_col+1):
-            run_checks(screen)
-            current = grid[col][row]
-            if col == hole and not current.is_start() and not current.is_end():
-                current.set_free()
-            else:
-                current.set_barrier()
+            # Pushed in reverse, the first area is divided first
+            areas.append((min_row, max_row, col+1, max_col))
+            areas.append((min_row, max_row, min_col, col-1))
+        else:
+            if height < 2:
+                continue
 
-            current.draw(screen)
+            # Randomly generate a wall
+            row = floor(rng.randrange(min_row, max_row+1) / 2) * 2
 
-        divide(screen, min_row, row-1, min_col, max_col)
-        divide(screen, row+1, max_row, min_col, max_col)
+            # Randomly generate a hole
+            hole = floor(rng.randrange(min_col, max_col+1) / 2) * 2 + 1
+
+            for col in range(min_col, max_col+1):
+                current = graph.get_node(col, row)
+                if col == hole and not current.is_start() and not current.is_end():
+                    current.set_free()
+                else:
+                    current.set_barrier()
+
+                yield current
+
+            areas.append((row+1, max_row, min_col, max_col))
+            areas.append((min_row, row-1, min_col, max_col))
 
 
 # Helper function for divide()
-def choose_orientation(width, height):
+def choose_orientation(width, height, rng=random):
     # True for horizontal, False for vertical
     if width < height:
         return True
     elif width > height:
         return False
     else:
-        return choice([True, False])
+        return rng.choice([True, False])
 
 
-# Recursive backtracker maze generator
-def backtrack(screen, row, col):
-    graph = screen.graph
-    grid = graph.grid
-    current = grid[row][col]
-    if current.is_barrier():
-        current.set_free()
-        current.draw(screen)
-
-    valid_directions = DIRECTIONS.copy()
-    shuffle(valid_directions)
+# Recursive backtracker maze generator (randomized depth-first search on an explicit stack
+# of (row, col, directions left to try), producing the same maze as the recursive version)
+def backtrack(graph, row, col, rng=random):
+    stack = []
+    yield from enter_cell(graph, stack, row, col, rng)
 
-    while valid_directions:
-        run_checks(screen)
+    while stack:
+        row, col, valid_directions = stack[-1]
+        if not valid_directions:
+            stack.pop()
+            continue
 
         # Pick a random far neighbor of current
         direction = valid_directions.pop()
         new_row, new_col = row + direction[0] * 2, col + direction[1] * 2
         if graph.is_valid_node(new_row, new_col, offset=1):
-            far_neighbor = grid[new_row][new_col]
+            far_neighbor = graph.get_node(new_row, new_col)
 
             if not far_neighbor.is_free():
                 new_row, new_col = row + direction[0], col + direction[1]
                 if graph.is_valid_node(new_row, new_col, offset=1):
                     # Turn the node between current and far_neighbor into a passage
-                    link = grid[new_row][new_col]
+                    link = graph.get_node(new_row, new_col)
                     if link.is_barrier():
                         link.set_free()
-                        link.draw(screen)
+                        yield link
 
-                backtrack(screen, far_neighbor.row, far_neighbor.col)
+                yield from enter_cell(graph, stack, far_neighbor.row, far_neighbor.col, rng)
 
 
-# Random maze generator (1/3 chance for barrier)
-def random_maze(screen):
-    graph_size = screen.graph.size
-    for col in range(graph_size):
-        for row in range(graph_size):
-            run_checks(screen)
+# Helper function for backtrack(), carves a cell and pushes it with its shuffled directions
+def enter_cell(graph, stack, row, col, rng):
+    current = graph.get_node(row, col)
+    if current.is_barrier():
+        current.set_free()
+        yield current
 
-            node = screen.graph.grid[row][col]
-            if choice([True, False, False]):
-                node.set_barrier()
-                node.draw(screen)
+    valid_directions = DIRECTIONS.copy()
+    rng.shuffle(valid_directions)
+    stack.append((row, col, valid_directions))
+
+
+# Kruskal's, Eller's and Wilson's mazes are passage adders (they start with a graph full of
+# barriers) working on cells at odd coordinates, with the nodes between them as walls
+
+
+# Helper function for the passage adders, returns the number of cell rows and cell columns
+def maze_dimensions(graph):
+    return (graph.rows - 1) // 2, (graph.cols - 1) // 2
+
+
+# Helper function for the passage adders, frees a node unless it is already open (or start/end)
+def carve(graph, row, col):
+    node = graph.get_node(row, col)
+    if node.is_barrier():
+        node.set_free()
+        yield node
+
+
+# Kruskal's maze generator
+def kruskals(graph, rng=random):
+    """
+        Removes the walls between cells in random order, skipping the ones whose cells are
+        already connected (checked with a union-find), which yields a random spanning tree.
+    """
+    height, width = maze_dimensions(graph)
+    walls = [(cell, cell + 1) for cell in range(height * width) if cell % width != width - 1]
+    walls += [(cell, cell + width) for cell in range(height * width - width)]
+    rng.shuffle(walls)
+    cells = UnionFind(height * width)
+
+    # A single cell has no walls to remove
+    if height * width == 1:
+        yield from carve(graph, 1, 1)
+
+    for first, second in walls:
+        if cells.union(first, second):
+            (first_row, first_col), (second_row, second_col) = divmod(first, width), divmod(second, width)
+            yield from carve(graph, first_row * 2 + 1, first_col * 2 + 1)
+            yield from carve(graph, first_row + second_row + 1, first_col + second_col + 1)
+            yield from carve(graph, second_row * 2 + 1, second_col * 2 + 1)
+
+
+# Eller's maze generator
+def ellers(graph, rng=random):
+    """
+        Carves one row of cells at a time, remembering only which set every cell of the current
+        row belongs to, so memory is O(width) no matter how tall the maze is. Neighbors from
+        different sets are joined at random, every set continues down at least once and the
+        last row joins whatever is still apart.
+    """
+    height, width = maze_dimensions(graph)
+    sets = [None] * width
+    next_set = 0
+
+    for cell_row in range(height):
+        row = cell_row * 2 + 1
+        last_row = cell_row == height - 1
+
+        for i in range(width):
+            if sets[i] is None:
+                sets[i] = next_set
+                next_set += 1
+            yield from carve(graph, row, i * 2 + 1)
+
+        members = {}
+        for i, current in enumerate(sets):
+            members.setdefault(current, []).append(i)
+
+        for i in range(width - 1):
+            if sets[i] != sets[i + 1] and (last_row or rng.random() < 0.5):
+                yield from carve(graph, row, i * 2 + 2)
+                # Only the smaller set is relabeled, so a cell changes sets O(log width) times per row
+                kept, merged = sets[i], sets[i + 1]
+                if len(members[kept]) < len(members[merged]):
+                    kept, merged = merged, kept
+                for j in members[merged]:
+                    sets[j] = kept
+                members[kept] += members.pop(merged)
+
+        if last_row:
+            break
+
+        columns = {}
+        for i, current in enumerate(sets):
+            columns.setdefault(current, []).append(i)
+
+        next_sets = [None] * width
+        for current, members in columns.items():
+            rng.shuffle(members)
+            for j, i in enumerate(members):
+                if j == 0 or rng.random() < 0.5:
+                    yield from carve(graph, row + 1, i * 2 + 1)
+                    next_sets[i] = current
+        sets = next_sets
+
+
+# Wilson's maze generator
+def wilsons(graph, rng=random):
+    """
+        Grows the maze with loop-erased random walks: from every cell not yet in the maze it walks
+        at random until it hits the maze, remembering only the last exit taken from each cell
+        (which erases the loops), then carves the walk. The result is a uniform spanning tree.
+    """
+    height, width = maze_dimensions(graph)
+    if not height or not width:
+        return
+
+    in_maze = bytearray(height * width)
+    exits = [None] * (height * width)
+    first = rng.randrange(height * width)
+    in_maze[first] = True
+    first_row, first_col = divmod(first, width)
+    yield from carve(graph, first_row * 2 + 1, first_col * 2 + 1)
+
+    for cell in range(height * width):
+        current = cell
+        while not in_maze[current]:
+            row, col = divmod(current, width)
+            dr, dc = rng.choice(DIRECTIONS)
+            if 0 <= row + dr < height and 0 <= col + dc < width:
+                exits[current] = (dr, dc)
+                current = (row + dr) * width + col + dc
+
+        current = cell
+        while not in_maze[current]:
+            in_maze[current] = True
+            row, col = divmod(current, width)
+            dr, dc = exits[current]
+            yield from carve(graph, row * 2 + 1, col * 2 + 1)
+            yield from carve(graph, row * 2 + 1 + dr, col * 2 + 1 + dc)
+            current = (row + dr) * width + col + dc
+
+
+# Random maze generator (each node becomes a barrier with probability density)
+def random_maze(graph, density=RANDOM_MAZE_DENSITY, rng=random):
+    mask = random_barrier_mask(graph, density, rng)
+
+    # Column by column, like the animation always went
+    cols, rows = np.nonzero(mask.T)
+    for row, col in zip(rows.tolist(), cols.tolist()):
+        node = graph.get_node(row, col)
+        node.set_barrier()
+        yield node
+
+
+def random_barrier_mask(graph, density=RANDOM_MAZE_DENSITY, rng=random):
+    """
+        Draws all barriers of a random maze at once as a (rows, cols) boolean array that never
+        covers the start and end nodes. The NumPy generator is seeded from rng.
+    """
+    generator = np.random.default_rng(rng.getrandbits(64))
+    mask = generator.random((graph.rows, graph.cols)) < density
+    mask &= (graph.state != START_STATE) & (graph.state != END_STATE)
+
+    return mask
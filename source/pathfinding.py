@@ -1,121 +1,752 @@
 from constants import *
-from helpers import run_checks
+from indexed_heap import IndexedHeap
 
+import numpy as np
 from collections import deque
-from heapq import heappush, heappop
-from math import sqrt
+from math import sqrt, inf
+from time import perf_counter
+
+
+class SearchGrid:
+    """
+        Plain snapshot of a graph that the search algorithms work on (no pygame involved).
+        size is a side length or a (rows, cols) pair, see grid_shape.
+        Cells are addressed by their flat index: row * cols + col.
+        weights[index] is the cost of entering a cell (all ones when not given), any integer >= 0.
+        adjacency[index] is a bitmask of the DIRECTIONS leading to open cells (see compute_adjacency).
+    """
+
+    def __init__(self, size, barriers, start, end, weights=None, adjacency=None):
+        self.size = size
+        self.rows, self.cols = grid_shape(size)
+        self.cell_count = self.rows * self.cols
+        self.barriers = barriers
+        self.start = start
+        self.end = end
+        self.weights = weights if weights is not None else [DEFAULT_WEIGHT] * self.cell_count
+        self.max_weight = max(self.weights, default=DEFAULT_WEIGHT)
+        self.min_weight = min(self.weights, default=DEFAULT_WEIGHT)
+        self.adjacency = adjacency if adjacency is not None else compute_adjacency(size, barriers)
+
+        # Flat index offsets of the open neighbors for every possible mask
+        self.neighbor_offsets = [tuple(dr * self.cols + dc for bit, (dr, dc) in enumerate(DIRECTIONS) if mask & (1 << bit))
+                                 for mask in range(ALL_DIRECTIONS_MASK + 1)]
+
+    def index(self, row, col):
+        return row * self.cols + col
+
+    def pos(self, index):
+        return divmod(index, self.cols)
+
+    def get_neighbors(self, index):
+        return [index + offset for offset in self.neighbor_offsets[self.adjacency[index]]]
+
+
+# Grid sizes are either the side length of a square grid or a (rows, cols) pair
+def grid_shape(size):
+    if isinstance(size, int):
+        return size, size
+
+    return tuple(size)
+
+
+# Bit i of a cell's mask is set when DIRECTIONS[i] leads to an in-bounds cell that is not a barrier
+def compute_adjacency(size, barriers):
+    rows, cols = grid_shape(size)
+    adjacency = [0] * (rows * cols)
+    for index in range(rows * cols):
+        row, col = divmod(index, cols)
+        for bit, (dr, dc) in enumerate(DIRECTIONS):
+            new_row, new_col = row + dr, col + dc
+            if 0 <= new_row < rows and 0 <= new_col < cols and not barriers[new_row * cols + new_col]:
+                adjacency[index] |= 1 << bit
+
+    return adjacency
+
+
+class SearchResult:
+    """
+        Outcome of a search: the path (list of cell indices, None if not found)
+        and the ordered stream of visited cells for the visualizer to replay.
+        Algorithms that track them also return flat distance and parent lists.
+        expanded counts the cells taken off the frontier and expanded, pushed the cells put on it
+        (a cell can be pushed more than once) and max_frontier the most cells it held at once.
+        Bidirectional searches mark which visits came from the backward frontier in backward.
+        Jump point searches count the cells they scanned without queueing them in scanned.
+        is_walk is False when path is not a walk between neighboring cells (DFS returns the order
+        it visited cells in up to the end).
+        stats is only set by instrumented_search.
+    """
+
+    def __init__(self, path, visited, dist=None, parents=None, expanded=0, backward=None,
+                 pushed=0, max_frontier=0, scanned=0, is_walk=True):
+        self.path = path
+        self.visited = visited
+        self.dist = dist
+        self.parents = parents
+        self.expanded = expanded
+        self.backward = backward
+        self.pushed = pushed
+        self.max_frontier = max_frontier
+        self.scanned = scanned
+        self.is_walk = is_walk
+        self.stats = None
+
+
+class SearchStats:
+    """
+        Cost of one search run: the counters its algorithm reported, the distinct cells it reached
+        (its start, every cell it discovered and the end when it found it or searched back from it),
+        whether it found the end, the length and cost of the path (None without a path or when it
+        is not a walk, see SearchResult) and the time the algorithm took, apart from animation_time,
+        which the visualizer fills in once the run has been replayed, and cached, which it sets for
+        runs replayed from its result cache. as_dict returns them keyed by SEARCH_STATS_FIELDS.
+    """
+
+    def __init__(self, algorithm, grid, result, compute_time):
+        self.algorithm = algorithm
+        self.rows, self.cols = grid.rows, grid.cols
+        self.expanded = result.expanded
+        self.pushed = result.pushed
+        self.max_frontier = result.max_frontier
+        # The visited stream may list a cell more than once (when pushed and when expanded, or by both
+        # sides of a bidirectional search) and leaves out the start or the end depending on the algorithm
+        reached = set(result.visited)
+        reached.add(grid.start)
+        self.found = result.path is not None
+        if self.found or result.backward is not None:
+            reached.add(grid.end)
+        self.visited = len(reached)
+        has_walk = self.found and result.is_walk
+        self.path_length = len(result.path) if has_walk else None
+        self.path_cost = sum(grid.weights[index] for index in result.path[1:]) if has_walk else None
+        self.compute_time = compute_time
+        self.animation_time = None
+        self.cached = False
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in SEARCH_STATS_FIELDS}
+
+
+# Walks parent pointers back from end, O(path length) and done once per search
+def reconstruct_path(parents, start, end):
+    path = [end]
+    current = end
+    while current != start:
+        current = parents[current]
+        path.append(current)
+    path.reverse()
+
+    return path
 
 
 # Breadth-first search algorithm
-def bfs(screen):
-    graph = screen.graph
-    queue = deque([(graph.get_start(), [graph.get_start()])])
+def bfs(grid):
+    start, end = grid.start, grid.end
+    cell_count = grid.cell_count
+    dist = [INF_DIST] * cell_count
+    parents = [NO_PARENT] * cell_count
+    dist[start] = 0
+    queue = deque([start])
+    visited = []
+    expanded, max_frontier = 0, 1
 
     while queue:
-        run_checks(screen)
-
-        current, path = queue.popleft()
-        for neighbor in current.get_neighbors(graph):
-            if not neighbor.been_visited():
-                if neighbor.is_end():
-                    return path + [neighbor]
+        current = queue.popleft()
+        expanded += 1
+        for neighbor in grid.get_neighbors(current):
+            if dist[neighbor] == INF_DIST:
+                dist[neighbor] = dist[current] + 1
+                parents[neighbor] = current
+                if neighbor == end:
+                    return SearchResult(reconstruct_path(parents, start, end), visited, dist, parents, expanded,
+                                        pushed=len(visited) + 1, max_frontier=max_frontier)
                 else:
-                    neighbor.set_visited()
-                    neighbor.draw(screen)
-                    queue.append((neighbor, path + [neighbor]))
+                    visited.append(neighbor)
+                    queue.append(neighbor)
+        if len(queue) > max_frontier:
+            max_frontier = len(queue)
+
+    # Every cell but the start is queued exactly once, when it is visited
+    return SearchResult(None, visited, dist, parents, expanded, pushed=len(visited) + 1, max_frontier=max_frontier)
 
 
 # Depth-first search algorithm
-def dfs(screen):
-    graph = screen.graph
-    stack = [graph.get_start()]
+def dfs(grid):
+    stack = [grid.start]
+    seen = set()
     visited = []
+    expanded, pushed, max_frontier = 0, 1, 1
 
     while stack:
-        run_checks(screen)
-
         current = stack.pop()
-        current.set_visited()
+        if current in seen:
+            continue
+        seen.add(current)
         visited.append(current)
+        expanded += 1
 
-        current.draw(screen)
-
-        if current.is_end():
-            return visited
+        if current == grid.end:
+            return SearchResult(visited, visited, expanded=expanded, pushed=pushed, max_frontier=max_frontier,
+                                is_walk=False)
 
-        for neighbor in current.get_neighbors(graph):
-            if not neighbor.been_visited():
+        for neighbor in grid.get_neighbors(current):
+            if neighbor not in seen:
                 stack.append(neighbor)
+                pushed += 1
+        if len(stack) > max_frontier:
+            max_frontier = len(stack)
+
+    return SearchResult(None, visited, expanded=expanded, pushed=pushed, max_frontier=max_frontier)
 
 
-# Dijkstra's algorithm
-def dijkstras(screen):
-    graph = screen.graph
-    start = graph.get_start()
+# Dijkstra's algorithm, on the bucket queue whenever the weights allow it
+def dijkstras(grid):
+    if grid.max_weight <= MAX_BUCKET_WEIGHT:
+        return dials(grid)
 
-    start.update_source_dist(0)
-    to_visit = [start]
+    return dijkstras_heap(grid)
+
+
+# Dijkstra's algorithm on a binary heap
+def dijkstras_heap(grid):
+    start, end = grid.start, grid.end
+    weights = grid.weights
+    cell_count = grid.cell_count
+    dist = [INF_DIST] * cell_count
+    parents = [NO_PARENT] * cell_count
+    dist[start] = 0
+    to_visit = IndexedHeap()
+    to_visit.push(start, 0)
+    visited = []
+    expanded, pushed, max_frontier = 0, 1, 1
 
     while to_visit:
-        run_checks(screen)
+        current, current_dist = to_visit.pop()
+        visited.append(current)
+        expanded += 1
+
+        if current == end:
+            return SearchResult(reconstruct_path(parents, start, end), visited, dist, parents, expanded,
+                                pushed=pushed, max_frontier=max_frontier)
+
+        for neighbor in grid.get_neighbors(current):
+            new_dist = current_dist + weights[neighbor]
+
+            if new_dist < dist[neighbor]:
+                dist[neighbor] = new_dist
+                parents[neighbor] = current
+                to_visit.push(neighbor, new_dist)
+                pushed += 1
+        if len(to_visit) > max_frontier:
+            max_frontier = len(to_visit)
+
+    return SearchResult(None, visited, dist, parents, expanded, pushed=pushed, max_frontier=max_frontier)
+
+
+# Dial's algorithm: Dijkstra's on a circular bucket queue for small integer weights
+def dials(grid):
+    """
+        Every pending distance lies within max_weight of the current one, so max_weight + 1
+        FIFO buckets indexed by distance modulo their count replace the heap. With 0/1 weights
+        this is 0-1 BFS and with unit weights it settles cells in the same order as BFS.
+    """
+    start, end = grid.start, grid.end
+    weights = grid.weights
+    cell_count = grid.cell_count
+    dist = [INF_DIST] * cell_count
+    parents = [NO_PARENT] * cell_count
+    done = [False] * cell_count
+    dist[start] = 0
+
+    bucket_count = grid.max_weight + 1
+    buckets = [deque() for _ in range(bucket_count)]
+    buckets[0].append(start)
+    pending = 1
+    current_dist = 0
+    visited = []
+    expanded, pushed, max_frontier = 0, 1, 1
 
-        current = heappop(to_visit)
-        current.set_visited()
-        current.draw(screen)
+    while pending:
+        bucket = buckets[current_dist % bucket_count]
+        while bucket:
+            current = bucket.popleft()
+            pending -= 1
+            if done[current]:
+                continue
+            done[current] = True
+            visited.append(current)
+            expanded += 1
 
-        for neighbor in current.get_neighbors(graph):
-            new_dist = current.get_source_dist() + 1
-            new_path = current.get_path() + [current]
+            if current == end:
+                return SearchResult(reconstruct_path(parents, start, end), visited, dist, parents, expanded,
+                                    pushed=pushed, max_frontier=max_frontier)
 
-            if new_dist < neighbor.get_source_dist():
-                neighbor.update_source_dist(new_dist)
-                neighbor.update_path(new_path)
-                heappush(to_visit, neighbor)
+            for neighbor in grid.get_neighbors(current):
+                new_dist = current_dist + weights[neighbor]
 
-            if current.is_end():
-                return current.get_path() + [current]
+                if new_dist < dist[neighbor]:
+                    dist[neighbor] = new_dist
+                    parents[neighbor] = current
+                    buckets[new_dist % bucket_count].append(neighbor)
+                    pending += 1
+                    pushed += 1
+            if pending > max_frontier:
+                max_frontier = pending
 
+        current_dist += 1
 
-# A* algorithm
-def astar(screen):
-    h = h_manhattan
-    graph = screen.graph
-    start, end = graph.get_start(), graph.get_end()
+    return SearchResult(None, visited, dist, parents, expanded, pushed=pushed, max_frontier=max_frontier)
 
-    open_list = [start]
-    start.update_source_dist(0)
-    start.update_target_dist(h(start.get_pos(), end.get_pos()))
+
+# A* algorithm
+def astar(grid):
+    h = h_grid(grid)
+    start, end = grid.start, grid.end
+    weights = grid.weights
+    end_pos = grid.pos(end)
+    cell_count = grid.cell_count
+
+    dist = [INF_DIST] * cell_count
+    parents = [NO_PARENT] * cell_count
+    dist[start] = 0
+    start_h = h(grid.pos(start), end_pos)
+
+    # Ties on f are broken by the lower h (closer to the end), then by insertion order
+    open_list = IndexedHeap()
+    open_list.push(start, (start_h, start_h))
+    visited = []
+    expanded, pushed, max_frontier = 0, 1, 1
 
     while open_list:
-        run_checks(screen)
+        current, _ = open_list.pop()
+        visited.append(current)
+        expanded += 1
+
+        if current == end:
+            return SearchResult(reconstruct_path(parents, start, end), visited, dist, parents, expanded,
+                                pushed=pushed, max_frontier=max_frontier)
+
+        for neighbor in grid.get_neighbors(current):
+            new_source_dist = dist[current] + weights[neighbor]
 
-        current = heappop(open_list)
-        current.set_visited()
-        current.draw(screen)
+            if new_source_dist < dist[neighbor]:
+                parents[neighbor] = current
+                dist[neighbor] = new_source_dist
+                neighbor_h = h(grid.pos(neighbor), end_pos)
 
-        if current.is_end():
-            path = [end]
-            temp = end
-            while not temp.is_start():
-                temp = temp.get_parent()
-                path.append(temp)
-            path.reverse()
+                if neighbor not in open_list:
+                    visited.append(neighbor)
+                open_list.push(neighbor, (new_source_dist + neighbor_h, neighbor_h))
+                pushed += 1
+        if len(open_list) > max_frontier:
+            max_frontier = len(open_list)
+
+    return SearchResult(None, visited, dist, parents, expanded, pushed=pushed, max_frontier=max_frontier)
+
+
+# Joins the forward tree path to meet with the backward tree path from meet to the end
+def join_paths(parents, start, end, meet):
+    path = reconstruct_path(parents[0], start, meet)
+    current = meet
+    while current != end:
+        current = parents[1][current]
+        path.append(current)
+
+    return path
+
+
+# Bidirectional breadth-first search algorithm
+def bidirectional_bfs(grid):
+    """
+        Grows whole BFS layers from the start and the end, always from the smaller frontier.
+        The first layer that touches the other side is finished before stopping, and the
+        shortest of the connections found in it is the shortest path.
+    """
+    start, end = grid.start, grid.end
+    cell_count = grid.cell_count
+    dist = ([INF_DIST] * cell_count, [INF_DIST] * cell_count)
+    parents = ([NO_PARENT] * cell_count, [NO_PARENT] * cell_count)
+    dist[0][start] = 0
+    dist[1][end] = 0
+    frontiers = ([start], [end])
+    visited = []
+    backward = []
+    expanded, max_frontier = 0, 2
+
+    while frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        own_dist, other_dist, own_parents = dist[side], dist[1 - side], parents[side]
+        best, meet = INF_DIST, None
+        next_frontier = []
+
+        for current in frontiers[side]:
+            expanded += 1
+            for neighbor in grid.get_neighbors(current):
+                if own_dist[neighbor] == INF_DIST:
+                    own_dist[neighbor] = own_dist[current] + 1
+                    own_parents[neighbor] = current
+                    next_frontier.append(neighbor)
+                    visited.append(neighbor)
+                    backward.append(side == 1)
+
+                if other_dist[neighbor] != INF_DIST and own_dist[neighbor] + other_dist[neighbor] < best:
+                    best, meet = own_dist[neighbor] + other_dist[neighbor], neighbor
+
+        if len(next_frontier) + len(frontiers[1 - side]) > max_frontier:
+            max_frontier = len(next_frontier) + len(frontiers[1 - side])
+        if meet is not None:
+            return SearchResult(join_paths(parents, start, end, meet), visited, expanded=expanded,
+                                backward=backward, pushed=len(visited) + 2, max_frontier=max_frontier)
+
+        frontiers = (next_frontier, frontiers[1]) if side == 0 else (frontiers[0], next_frontier)
+
+    return SearchResult(None, visited, expanded=expanded, backward=backward,
+                        pushed=len(visited) + 2, max_frontier=max_frontier)
+
+
+# Bidirectional A* algorithm
+def bidirectional_astar(grid):
+    """
+        Runs A* from the start towards the end and from the end towards the start, expanding
+        the side with the smaller open list. mu is the cheapest connection found so far; no
+        cheaper one exists once mu <= the smallest f on either side, since a cheaper path
+        would have to pass through an open node of both sides (Pohl's criterion).
+    """
+    h = h_grid(grid)
+    start, end = grid.start, grid.end
+    weights = grid.weights
+    targets = (grid.pos(end), grid.pos(start))
+    cell_count = grid.cell_count
+
+    dist = ([INF_DIST] * cell_count, [INF_DIST] * cell_count)
+    parents = ([NO_PARENT] * cell_count, [NO_PARENT] * cell_count)
+    dist[0][start] = 0
+    dist[1][end] = 0
+    open_lists = (IndexedHeap(), IndexedHeap())
+    start_h = h(grid.pos(start), targets[0])
+    open_lists[0].push(start, (start_h, start_h))
+    open_lists[1].push(end, (start_h, start_h))
+
+    mu, meet = INF_DIST, None
+    visited = []
+    backward = []
+    expanded, pushed, max_frontier = 0, 2, 2
 
-            return path
+    while open_lists[0] and open_lists[1]:
+        if mu <= max(open_lists[0].peek()[1][0], open_lists[1].peek()[1][0]):
+            break
+
+        side = 0 if len(open_lists[0]) <= len(open_lists[1]) else 1
+        own_dist, other_dist, own_parents = dist[side], dist[1 - side], parents[side]
+        open_list, target = open_lists[side], targets[side]
+
+        current, _ = open_list.pop()
+        visited.append(current)
+        backward.append(side == 1)
+        expanded += 1
 
-        for neighbor in current.get_neighbors(graph):
-            new_source_dist = current.get_source_dist() + 1
+        for neighbor in grid.get_neighbors(current):
+            # Both sides pay for entering a cell in the start-to-end direction
+            new_dist = own_dist[current] + (weights[neighbor] if side == 0 else weights[current])
 
-            if new_source_dist < neighbor.get_source_dist():
-                neighbor.update_parent(current)
-                neighbor.update_source_dist(new_source_dist)
-                neighbor.update_target_dist(
-                    new_source_dist + h(neighbor.get_pos(), end.get_pos()))
+            if new_dist < own_dist[neighbor]:
+                own_dist[neighbor] = new_dist
+                own_parents[neighbor] = current
+                neighbor_h = h(grid.pos(neighbor), target)
 
                 if neighbor not in open_list:
-                    heappush(open_list, neighbor)
-                    neighbor.set_visited()
-                    neighbor.draw(screen)
+                    visited.append(neighbor)
+                    backward.append(side == 1)
+                open_list.push(neighbor, (new_dist + neighbor_h, neighbor_h))
+                pushed += 1
+
+                if other_dist[neighbor] != INF_DIST and new_dist + other_dist[neighbor] < mu:
+                    mu, meet = new_dist + other_dist[neighbor], neighbor
+        if len(open_lists[0]) + len(open_lists[1]) > max_frontier:
+            max_frontier = len(open_lists[0]) + len(open_lists[1])
+
+    if meet is None:
+        return SearchResult(None, visited, expanded=expanded, backward=backward,
+                            pushed=pushed, max_frontier=max_frontier)
+
+    return SearchResult(join_paths(parents, start, end, meet), visited, expanded=expanded, backward=backward,
+                        pushed=pushed, max_frontier=max_frontier)
+
+
+# Jump point search (uniform cost: weights are ignored, like in BFS)
+def jps(grid, diagonal=False):
+    """
+        A* over jump points only: straight (and with diagonal=True, diagonal) runs are scanned
+        without queueing anything until a forced neighbor or the end shows up, which prunes
+        the symmetric paths A* would expand one by one. Diagonal moves never cut corners.
+    """
+    rows, cols, barriers = grid.rows, grid.cols, grid.barriers
+    start, end = grid.pos(grid.start), grid.pos(grid.end)
+    h = h_octile if diagonal else h_manhattan
+    directions = DIRECTIONS + DIAGONAL_DIRECTIONS if diagonal else DIRECTIONS
+
+    def walkable(row, col):
+        return 0 <= row < rows and 0 <= col < cols and not barriers[row * cols + col]
+
+    # Straight scans only depend on the grid, so their jump points are looked up in tables
+    straight_jumps = straight_jump_tables(grid, diagonal)
+    scanned = 0
+
+    def jump(row, col, dr, dc):
+        nonlocal scanned
+        # Straight runs are table lookups, apart from vertical ones without diagonal moves
+        if not (dr and dc) and (dc or diagonal):
+            if not walkable(row, col):
+                return None
+            jumps, run_lengths = straight_jumps[(dr, dc)]
+            scanned += run_lengths.item(row * cols + col)
+            jump_index = jumps.item(row * cols + col)
+            return divmod(jump_index, cols) if jump_index != NO_PARENT else None
+
+        while walkable(row, col):
+            scanned += 1
+            if (row, col) == end:
+                return row, col
+
+            if dr and dc:
+                if jump(row + dr, col, dr, 0) or jump(row, col + dc, 0, dc):
+                    return row, col
+            # Without diagonal moves, vertical runs must look for horizontal jump points
+            elif is_forced(row, col, dr) or jump(row, col+1, 0, 1) or jump(row, col-1, 0, -1):
+                return row, col
+
+            if not (walkable(row + dr, col) and walkable(row, col + dc)):
+                return None
+            row, col = row + dr, col + dc
+
+        return None
+
+    # Whether a barrier beside a vertical move makes a neighbor only reachable through this cell
+    def is_forced(row, col, dr):
+        return (walkable(row, col-1) and not walkable(row-dr, col-1)) or \
+            (walkable(row, col+1) and not walkable(row-dr, col+1))
+
+    def pruned_neighbors(row, col, parent):
+        if parent is None:
+            return [(row + dr, col + dc) for dr, dc in directions
+                    if walkable(row + dr, col + dc) and walkable(row + dr, col) and walkable(row, col + dc)]
+
+        dr = (row > parent[0]) - (row < parent[0])
+        dc = (col > parent[1]) - (col < parent[1])
+        if dr and dc:
+            candidates = [(row + dr, col), (row, col + dc)]
+            if walkable(row + dr, col) and walkable(row, col + dc):
+                candidates.append((row + dr, col + dc))
+        elif dc:
+            candidates = [(row - 1, col), (row + 1, col), (row, col + dc)]
+            if diagonal:
+                candidates += [(row - 1, col + dc), (row + 1, col + dc)]
+        else:
+            candidates = [(row, col - 1), (row, col + 1), (row + dr, col)]
+            if diagonal:
+                candidates += [(row + dr, col - 1), (row + dr, col + 1)]
+
+        return [(new_row, new_col) for new_row, new_col in candidates
+                if walkable(new_row, new_col) and walkable(new_row, col) and walkable(row, new_col)]
+
+    dist = {start: 0}
+    parents = {start: None}
+    open_list = IndexedHeap()
+    open_list.push(start, (h(start, end), h(start, end)))
+    visited = []
+    expanded, pushed, max_frontier = 0, 1, 1
+
+    while open_list:
+        current, _ = open_list.pop()
+        visited.append(current[0] * cols + current[1])
+        expanded += 1
+
+        if current == end:
+            jump_points = [end]
+            while parents[jump_points[-1]] is not None:
+                jump_points.append(parents[jump_points[-1]])
+            jump_points.reverse()
+
+            return SearchResult(expand_jump_points(jump_points, cols), visited, expanded=expanded,
+                                pushed=pushed, max_frontier=max_frontier, scanned=scanned)
+
+        for neighbor_row, neighbor_col in pruned_neighbors(*current, parents[current]):
+            jump_point = jump(neighbor_row, neighbor_col,
+                              neighbor_row - current[0], neighbor_col - current[1])
+            if jump_point is None:
+                continue
+
+            new_dist = dist[current] + h(current, jump_point)
+            if new_dist < dist.get(jump_point, inf):
+                dist[jump_point] = new_dist
+                parents[jump_point] = current
+                jump_h = h(jump_point, end)
+
+                if jump_point not in open_list:
+                    visited.append(jump_point[0] * cols + jump_point[1])
+                open_list.push(jump_point, (new_dist + jump_h, jump_h))
+                pushed += 1
+        if len(open_list) > max_frontier:
+            max_frontier = len(open_list)
+
+    return SearchResult(None, visited, expanded=expanded, pushed=pushed, max_frontier=max_frontier,
+                        scanned=scanned)
+
+
+# 8-connected jump point search
+def jps_diagonal(grid):
+    return jps(grid, diagonal=True)
+
+
+def straight_jump_tables(grid, diagonal=False):
+    """
+        Maps every straight direction JPS scans along to two flat arrays with, for every cell, the flat
+        index of the jump point a scan from it stops at (NO_PARENT if it runs into a barrier or the
+        edge first): the first cell that is the end or has a forced neighbor, and the number of cells
+        the scan looks at on its way. Scans go along rows, and with diagonal=True along columns too.
+    """
+    rows, cols = grid.rows, grid.cols
+    walkable = np.pad(~np.array(grid.barriers, dtype=bool).reshape(rows, cols), 1)
+    is_end = np.zeros((rows, cols), dtype=bool)
+    is_end[grid.pos(grid.end)] = True
+    row_indices, col_indices = np.indices((rows, cols))
+
+    tables = {}
+    for dr, dc in DIRECTIONS if diagonal else ((0, 1), (0, -1)):
+        # A neighbor beside the move is forced when the cell behind it is a barrier
+        center = walkable[1:-1, 1:-1]
+        if dc:
+            forced = (walkable[:-2, 1:-1] & ~walkable[:-2, 1-dc:cols+1-dc]) | \
+                (walkable[2:, 1:-1] & ~walkable[2:, 1-dc:cols+1-dc])
+        else:
+            forced = (walkable[1:-1, :-2] & ~walkable[1-dr:rows+1-dr, :-2]) | \
+                (walkable[1:-1, 2:] & ~walkable[1-dr:rows+1-dr, 2:])
+        stops = center & (forced | is_end)
+
+        # Scans run along axis 1 towards higher positions once the arrays are turned that way
+        turn = (lambda array: array.T) if dr else (lambda array: array)
+        flip = (lambda array: array[:, ::-1]) if dr + dc < 0 else (lambda array: array)
+        oriented_stops, oriented_open = flip(turn(stops)), flip(turn(center))
+        length = oriented_stops.shape[1]
+        positions = np.arange(length)
+        next_stop = np.minimum.accumulate(np.where(oriented_stops, positions, length)[:, ::-1], axis=1)[:, ::-1]
+        next_block = np.minimum.accumulate(np.where(oriented_open, length, positions)[:, ::-1], axis=1)[:, ::-1]
+        found = turn(flip(next_stop < next_block))
+        # A scan looks at every cell up to its jump point, or up to the barrier or edge that stops it
+        run_lengths = turn(flip(np.where(next_stop < next_block, next_stop + 1, next_block) - positions))
+        stop_position = turn(flip(next_stop))
+        if dr + dc < 0:
+            stop_position = length - 1 - stop_position
+
+        jump_rows = stop_position if dr else row_indices
+        jump_cols = col_indices if dr else stop_position
+        tables[(dr, dc)] = (np.where(found, jump_rows * cols + jump_cols, NO_PARENT).ravel(),
+                            run_lengths.ravel())
+
+    return tables
+
+
+# Fills in the cells between consecutive jump points (they always lie on a straight or diagonal line)
+def expand_jump_points(jump_points, cols):
+    path = [jump_points[0][0] * cols + jump_points[0][1]]
+    for (row, col), (next_row, next_col) in zip(jump_points, jump_points[1:]):
+        dr = (next_row > row) - (next_row < row)
+        dc = (next_col > col) - (next_col < col)
+        while (row, col) != (next_row, next_col):
+            row, col = row + dr, col + dc
+            path.append(row * cols + col)
+
+    return path
+
+
+# Dijkstra's tree grown from all sources at once, on the bucket queue whenever the weights allow it
+def search_tree(grid, sources, targets=None, reverse=False):
+    if grid.max_weight <= MAX_BUCKET_WEIGHT:
+        return dials_tree(grid, sources, targets, reverse)
+
+    return heap_tree(grid, sources, targets, reverse)
+
+
+def dials_tree(grid, sources, targets=None, reverse=False):
+    """
+        Dial's algorithm (see dials) from every cell in sources, that settles cells until none of
+        targets is left (or the whole reachable grid without targets) and returns the flat distance
+        and parent lists. With reverse=True distances are the costs of the paths from each cell to
+        the nearest source (a step pays the weight of the cell it enters, so the direction matters).
+    """
+    weights = grid.weights
+    cell_count = grid.cell_count
+    dist = [INF_DIST] * cell_count
+    parents = [NO_PARENT] * cell_count
+    done = [False] * cell_count
+    remaining = set(targets) if targets is not None else None
+
+    bucket_count = grid.max_weight + 1
+    buckets = [deque() for _ in range(bucket_count)]
+    for source in sources:
+        dist[source] = 0
+        buckets[0].append(source)
+    pending = len(buckets[0])
+    current_dist = 0
+
+    while pending:
+        bucket = buckets[current_dist % bucket_count]
+        while bucket:
+            current = bucket.popleft()
+            pending -= 1
+            if done[current]:
+                continue
+            done[current] = True
+
+            if remaining is not None:
+                remaining.discard(current)
+                if not remaining:
+                    return dist, parents
+
+            for neighbor in grid.get_neighbors(current):
+                new_dist = current_dist + (weights[current] if reverse else weights[neighbor])
+
+                if new_dist < dist[neighbor]:
+                    dist[neighbor] = new_dist
+                    parents[neighbor] = current
+                    buckets[new_dist % bucket_count].append(neighbor)
+                    pending += 1
+
+        current_dist += 1
+
+    return dist, parents
+
+
+def heap_tree(grid, sources, targets=None, reverse=False):
+    # Same as dials_tree on a binary heap, for weights too heavy for buckets
+    weights = grid.weights
+    cell_count = grid.cell_count
+    dist = [INF_DIST] * cell_count
+    parents = [NO_PARENT] * cell_count
+    remaining = set(targets) if targets is not None else None
+    to_visit = IndexedHeap()
+    for source in sources:
+        dist[source] = 0
+        to_visit.push(source, 0)
+
+    while to_visit:
+        current, current_dist = to_visit.pop()
+
+        if remaining is not None:
+            remaining.discard(current)
+            if not remaining:
+                return dist, parents
+
+        for neighbor in grid.get_neighbors(current):
+            new_dist = current_dist + (weights[current] if reverse else weights[neighbor])
+
+            if new_dist < dist[neighbor]:
+                dist[neighbor] = new_dist
+                parents[neighbor] = current
+                to_visit.push(neighbor, new_dist)
+
+    return dist, parents
 
 
 # Heuristic function for A* (Manhattan distance)
@@ -127,6 +758,16 @@ def h_manhattan(pos1, pos2):
     return h
 
 
+# Heuristic function for A* on a grid: every step costs at least its cheapest weight, so the Manhattan
+# distance times that weight never overestimates (and is 0 on grids with free cells of weight 0)
+def h_grid(grid):
+    scale = grid.min_weight
+    if scale == 1:
+        return h_manhattan
+
+    return lambda pos1, pos2: scale * h_manhattan(pos1, pos2)
+
+
 # Heuristic function for A* (Euclidean distance)
 def h_euclidean(pos1, pos2):
     x1, y1 = pos1
@@ -134,3 +775,34 @@ def h_euclidean(pos1, pos2):
     h = sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2)
 
     return h
+
+
+# Heuristic function for 8-connected searches (octile distance)
+def h_octile(pos1, pos2):
+    x1, y1 = pos1
+    x2, y2 = pos2
+    dx, dy = abs(x1 - x2), abs(y1 - y2)
+    h = max(dx, dy) + (sqrt(2) - 1) * min(dx, dy)
+
+    return h
+
+
+PATHFINDING_ALGORITHMS = {
+    "BFS": bfs,
+    "DFS": dfs,
+    "Dijkstra's": dijkstras,
+    "A*": astar,
+    "JPS": jps,
+    "JPS-8": jps_diagonal,
+    "Bi-BFS": bidirectional_bfs,
+    "Bi-A*": bidirectional_astar
+}
+
+
+# Runs the algorithm registered under label and attaches the SearchStats of the run to its result
+def instrumented_search(label, grid):
+    start_time = perf_counter()
+    result = PATHFINDING_ALGORITHMS[label](grid)
+    result.stats = SearchStats(label, grid, result, perf_counter() - start_time)
+
+    return result
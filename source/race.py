@@ -0,0 +1,184 @@
+from constants import *
+from helpers import *
+from pathfinding import instrumented_search
+from graph import mark_cells, visited_cells
+
+import pygame
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from math import ceil, sqrt
+from time import perf_counter
+import os
+
+
+# Worker processes are started by the first race and reused by the next ones
+executor = None
+
+
+def get_executor():
+    global executor
+    if executor is None:
+        executor = ProcessPoolExecutor(max_workers=os.cpu_count())
+
+    return executor
+
+
+def run_race(grid, labels):
+    """
+        Runs the algorithms registered under labels on the (pygame-free) grid, each in its own
+        worker process, and returns their results with stats in the order of labels.
+    """
+    return list(get_executor().map(instrumented_search, labels, repeat(grid, len(labels))))
+
+
+class RaceView:
+    """
+        Split viewports over the grid area, one per raced algorithm, each replaying its search
+        on its own copy of the graph's state array. All panels advance by the same number of
+        visited cells, so the one that finishes first expanded the fewest nodes.
+    """
+
+    def __init__(self, graph, labels, results):
+        self.graph = graph
+        self.labels = labels
+        self.results = results
+        self.states = [graph.state.copy() for _ in labels]
+        self.progress = [0] * len(labels)
+
+        # Ranked by compute time, which is what the algorithms actually raced on
+        order = sorted(range(len(labels)), key=lambda panel: results[panel].stats.compute_time)
+        self.ranks = [order.index(panel) + 1 for panel in range(len(labels))]
+
+    def finished(self):
+        return all(progress == len(result.visited) for progress, result in zip(self.progress, self.results))
+
+    def advance(self, steps=None):
+        """
+            Marks the next steps visited cells of every panel (all of the remaining ones if steps
+            is None) and draws the path of the panels that got to the end of their replay.
+        """
+        for panel, result in enumerate(self.results):
+            start = self.progress[panel]
+            if start == len(result.visited):
+                continue
+
+            end = len(result.visited) if steps is None else min(start + steps, len(result.visited))
+            mark_cells(self.states[panel], *visited_cells(result, start, end))
+
+            self.progress[panel] = end
+            if end == len(result.visited) and result.path:
+                mark_cells(self.states[panel], np.array(result.path, dtype=np.int64),
+                           np.full(len(result.path), PATH_STATE, dtype=np.uint8))
+
+    def get_panels(self, window):
+        """
+            Returns the window rect of every panel: the square grid area is split into a grid of
+            slots, and every panel is the largest rect with the graph's aspect ratio in its slot.
+        """
+        graph = self.graph
+        area_size = get_grid_size(window, graph)
+        left, top = get_side_tab_size(window, graph), get_tb_tab_size(window, graph)
+        slot_cols = ceil(sqrt(len(self.labels)))
+        slot_rows = ceil(len(self.labels) / slot_cols)
+        slot_width = (area_size - RACE_PANEL_GAP * (slot_cols - 1)) / slot_cols
+        slot_height = (area_size - RACE_PANEL_GAP * (slot_rows - 1)) / slot_rows
+        cell_size = min(slot_width / graph.cols, slot_height / graph.rows)
+        width, height = max(1, round(graph.cols * cell_size)), max(1, round(graph.rows * cell_size))
+
+        panels = []
+        for panel in range(len(self.labels)):
+            slot_row, slot_col = divmod(panel, slot_cols)
+            x = left + slot_col * (slot_width + RACE_PANEL_GAP) + (slot_width - width) / 2
+            y = top + slot_row * (slot_height + RACE_PANEL_GAP) + (slot_height - height) / 2
+            panels.append(pygame.Rect(round(x), round(y), width, height))
+
+        return panels
+
+    def draw(self, screen):
+        window, graph = screen.window, self.graph
+        area_size = get_grid_size(window, graph)
+        area = pygame.Rect(get_side_tab_size(window, graph), get_tb_tab_size(window, graph),
+                           area_size + 1, area_size + 1)
+        window.fill(screen.background, area)
+
+        font_size = round(get_legend_font_size(window, graph) * RACE_FONT_SCALE)
+        for panel, rect in enumerate(self.get_panels(window)):
+            cell_size = rect.width / graph.cols
+            block = max(1, ceil(1 / cell_size))
+            colors = graph.get_cell_colors(block=block, state=self.states[panel])
+            cells = pygame.surfarray.make_surface(colors.transpose(1, 0, 2))
+            # Blocks on the bottom and right edges may be padded past the graph, they are clipped
+            size = (round(colors.shape[1] * block * cell_size), round(colors.shape[0] * block * cell_size))
+            window.blit(pygame.transform.scale(cells, size), rect, pygame.Rect((0, 0), rect.size))
+
+            # Labels are clipped to their panel
+            y = rect.y
+            for text in self.get_label(panel):
+                label = render_text(text, font_size, LEGEND_FONT_COLOR)
+                backdrop = pygame.Surface((min(label.get_width(), rect.width), label.get_height()))
+                backdrop.set_alpha(RACE_LABEL_ALPHA)
+                window.blit(backdrop, (rect.x, y))
+                window.blit(label, (rect.x, y), pygame.Rect((0, 0), backdrop.get_size()))
+                y += label.get_height()
+
+        screen.renderer.mark_dirty(area)
+
+    def get_label(self, panel):
+        stats = self.results[panel].stats
+        lines = [f"{self.ranks[panel]}. {self.labels[panel]}",
+                 f"{stats.compute_time * 1000:.1f} ms, {stats.expanded} expanded"]
+        if not stats.found:
+            lines.append("no path")
+
+        return lines
+
+
+def play_race(screen, view):
+    # Same frame budget as helpers.play, after FINISH every panel jumps to its end
+    clock = pygame.time.Clock()
+    budget = 0
+    while not view.finished():
+        if screen.animate:
+            budget += FRAME_DURATION / get_step_delay(screen)
+            steps = int(budget)
+            budget -= steps
+            view.advance(steps)
+        else:
+            view.advance()
+
+        view.draw(screen)
+        screen.renderer.flush()
+        if screen.animate:
+            clock.tick(FPS)
+            run_checks(screen)
+
+
+def race(screen, labels):
+    """
+        Races the algorithms in labels on a copy of the current graph in parallel worker
+        processes, then replays them side by side until the next click ends the race.
+    """
+    graph = screen.graph
+    graph.clear()
+    grid = graph.snapshot()
+
+    start_time = perf_counter()
+    results = run_race(grid, labels)
+    elapsed = perf_counter() - start_time
+
+    view = RaceView(graph, labels, results)
+    screen.race_view = view
+    workers = min(len(labels), os.cpu_count())
+    screen.set_status(f"Raced {len(labels)} algorithms in {elapsed * 1000:.0f} ms "
+                      f"on {workers} worker process{'es' if workers > 1 else ''}")
+    screen.draw()
+
+    start_time = perf_counter()
+    play_race(screen, view)
+    animation_time = perf_counter() - start_time
+
+    # The winner is added last, so the stats panel shows it
+    for panel in sorted(range(len(labels)), key=lambda panel: -view.ranks[panel]):
+        results[panel].stats.animation_time = animation_time
+        screen.add_stats(results[panel].stats)
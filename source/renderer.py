@@ -0,0 +1,33 @@
+from constants import *
+
+import pygame
+
+
+class Renderer:
+    """
+        Collects the rects drawn during an animation and pushes them to the display in one
+        pygame.display.update(rects) call per frame, instead of flipping the whole window per cell.
+    """
+
+    def __init__(self):
+        self.dirty_rects = []
+        self.full_update = False
+
+    def mark_dirty(self, rect):
+        # Past a certain count one full update is cheaper than updating every rect
+        if self.full_update:
+            return
+        if len(self.dirty_rects) >= MAX_DIRTY_RECTS:
+            self.full_update = True
+            self.dirty_rects.clear()
+        else:
+            self.dirty_rects.append(rect)
+
+    def flush(self, full=False):
+        if full or self.full_update:
+            pygame.display.update()
+            self.full_update = False
+            self.dirty_rects.clear()
+        elif self.dirty_rects:
+            pygame.display.update(self.dirty_rects)
+            self.dirty_rects.clear()
@@ -0,0 +1,54 @@
+"""
+    Cache of search results, so running the same search on an unchanged grid again replays the
+    stored result instead of searching. Keys come from Graph.search_key, which hashes the grid.
+"""
+from constants import *
+
+from collections import OrderedDict
+import sys
+
+
+# Every list item is counted as a pointer plus an int object of its own, an upper bound
+# since small ints and repeated values are shared
+INT_OBJECT_BYTES = sys.getsizeof(INF_DIST)
+
+
+class ResultCache:
+    """
+        Least recently used entries whose estimated sizes add up to at most budget bytes.
+        Values larger than the whole budget are not stored.
+    """
+
+    def __init__(self, budget=RESULT_CACHE_BYTES):
+        self.budget = budget
+        self.size = 0
+        self.entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value, size):
+        if key in self.entries:
+            self.size -= self.entries.pop(key)[1]
+        if size > self.budget:
+            return
+
+        self.entries[key] = (value, size)
+        self.size += size
+        while self.size > self.budget:
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.size -= evicted_size
+
+
+# Estimated memory of a SearchResult, its lists of cells make up nearly all of it
+def result_size(result):
+    lists = (result.path, result.visited, result.dist, result.parents, result.backward)
+    return sum(sys.getsizeof(items) + len(items) * INT_OBJECT_BYTES for items in lists if items)
@@ -2,8 +2,12 @@ from constants import *
 from buttons import initialize_buttons
 from legend import initialize_legend
 from graph import Graph
+from renderer import Renderer
+from result_cache import ResultCache
+from helpers import draw_status, clear_text_cache, parse_graph_size
 
 import pygame
+from random import randrange
 
 
 class Screen:
@@ -16,32 +20,90 @@ class Screen:
         self.legend = None
         self.graph = None
         self.selected_algorithm = None
-        self.delay_multiplier = 1
+        self.paint_weights = False
+        self.status = ""
+        self.seed = randrange(MAX_SEED + 1)
+        self.stats_history = []
+        self.exported_stats = 0
+        self.show_stats = False
+        self.race_algorithms = []
+        self.race_view = None
+        # Text typed into the graph size prompt, None while it is closed
+        self.size_input = None
+        self.result_cache = ResultCache()
+        self.renderer = Renderer()
+        self.layers = {}
+        self.dirty_layers = set(LAYERS)
+        self.redraw = True
 
     def draw(self):
+        """
+            Composes the window out of the cached layers, re-rendering only the invalidated ones.
+        """
         self.animate = False
         self.window.fill(self.background)
 
         if self.graph:
-            self.graph.draw(self)
-            if self.legend:
-                self.legend.draw(self.window, self.graph)
+            if self.race_view:
+                self.race_view.draw(self)
+            elif "grid" in self.dirty_layers:
+                self.graph.draw(self)
+            else:
+                self.graph.blit(self)
 
-        self.draw_buttons()
+            if "legend" in self.dirty_layers:
+                self.render_legend_layer()
+            self.window.blit(self.layers["legend"], (0, 0))
 
-        self.animate = True
-        pygame.display.update()
+        self.draw_buttons(update=False)
 
-    def draw_buttons(self):
-        if self.buttons:
+        self.animate = True
+        self.dirty_layers.clear()
+        self.redraw = False
+        self.renderer.flush(full=True)
+
+    def refresh(self):
+        # Called every frame of the main loop, the display is only touched when something changed
+        if self.redraw:
+            self.draw()
+        else:
+            self.renderer.flush()
+
+    def invalidate(self, *layers):
+        # Layers passed in are re-rendered, without any the window is only composed again
+        self.dirty_layers.update(layers)
+        self.redraw = True
+
+    def create_layer(self):
+        return pygame.Surface(self.window.get_size(), pygame.SRCALPHA)
+
+    def render_legend_layer(self):
+        layer = self.create_layer()
+        if self.legend:
+            stats = self.stats_history[-1] if self.show_stats and self.stats_history else None
+            self.legend.draw(layer, self.graph, stats)
+        if self.status:
+            draw_status(self, layer)
+
+        self.layers["legend"] = layer
+
+    def draw_buttons(self, update=True):
+        if "buttons" in self.dirty_layers or "buttons" not in self.layers:
+            layer = self.create_layer()
             for current_buttons in self.buttons.values():
                 for button in current_buttons.values():
-                    button.draw(self.window)
+                    button.draw(layer)
 
-        pygame.display.update()
+            self.layers["buttons"] = layer
+            self.dirty_layers.discard("buttons")
+
+        self.window.blit(self.layers["buttons"], (0, 0))
+        if update:
+            pygame.display.update()
 
     def resize(self, new_window):
         self.window = new_window
+        clear_text_cache()
         if self.graph:
             self.graph.resize_nodes(new_window)
             if self.legend:
@@ -50,21 +112,44 @@ class Screen:
                 algorithm_running = not self.buttons["action_buttons"]["RUN"].visible
                 initialize_buttons(self, algorithm_running)
 
+        self.invalidate(*LAYERS)
         self.draw()
 
-    def reset_delay_multiplier(self):
-        self.delay_multiplier = 1
-
     def add_buttons(self, label, buttons):
         self.buttons[label] = buttons
+        self.invalidate("buttons")
 
     def update_legend(self, new_legend):
         self.legend = new_legend
+        self.invalidate("legend")
+
+    def set_status(self, status):
+        self.status = status
+        self.invalidate("legend")
+
+    def add_stats(self, stats):
+        self.stats_history.append(stats)
+        self.show_stats = True
+        self.invalidate("legend")
+
+    def toggle_stats(self):
+        self.show_stats = not self.show_stats
+        self.invalidate("legend")
+
+    def end_race(self):
+        if self.race_view:
+            self.race_view = None
+            self.invalidate("grid")
+
+    def new_seed(self):
+        self.seed = randrange(MAX_SEED + 1)
 
     def update_graph_size(self, new_graph_size):
         if new_graph_size != self.graph.size:
+            self.end_race()
             self.graph = Graph(self.window, new_graph_size,
                                self.graph.gridlines)
+            self.invalidate(*LAYERS)
 
     def update_animation_speed(self, new_animation_speed):
         self.animation_speed = new_animation_speed
@@ -74,12 +159,15 @@ def initialize_screen(window):
     screen = Screen(window, background=BARRIER_COLOR)
     try:
         with open("settings.txt", "r") as file:
-            graph_size, gridlines, animation_speed = file.readline().split(" ")
-            screen.graph = (Graph(window, size=int(graph_size)))
+            graph_size, gridlines, animation_speed, *seed = file.readline().split(" ")
+            # Sizes that cannot be parsed fall back to the default one
+            screen.graph = (Graph(window, size=parse_graph_size(graph_size) or MEDIUM))
             screen.graph.gridlines = bool(int(gridlines))
             screen.animation_speed = animation_speed
+            # Files saved before mazes had seeds have no fourth value
+            if seed:
+                screen.seed = int(seed[0])
     except FileNotFoundError:
-        screen.graph.gridlines = False
         screen.graph = (Graph(window, size=MEDIUM))
         screen.animation_speed = NORMAL
 
@@ -0,0 +1,36 @@
+class UnionFind:
+    """
+        Disjoint sets of the integers 0..count-1 with path compression and union by size,
+        so any sequence of operations runs in nearly constant amortized time per operation.
+    """
+
+    def __init__(self, count):
+        self.parents = list(range(count))
+        self.sizes = [1] * count
+
+    def find(self, item):
+        parents = self.parents
+        root = item
+        while parents[root] != root:
+            root = parents[root]
+
+        # Point every node on the way directly at the root
+        while parents[item] != root:
+            parents[item], item = root, parents[item]
+
+        return root
+
+    def union(self, first, second):
+        """
+            Merges the sets of first and second, returns False if they were already one set.
+        """
+        first, second = self.find(first), self.find(second)
+        if first == second:
+            return False
+
+        if self.sizes[first] < self.sizes[second]:
+            first, second = second, first
+        self.parents[second] = first
+        self.sizes[first] += self.sizes[second]
+
+        return True